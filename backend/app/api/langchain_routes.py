@@ -388,7 +388,7 @@ async def generate_quiz(
     Generate a quiz (demonstrates quiz caching functionality)
     """
     try:
-        quiz_data = rag_service.generate_quiz(
+        quiz_data = await rag_service.agenerate_quiz(
             topic=quiz_request.topic,
             question_count=quiz_request.question_count,
             difficulty=quiz_request.difficulty
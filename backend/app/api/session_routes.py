@@ -34,6 +34,14 @@ def get_session_service(db_manager: DatabaseManager = Depends(get_database_manag
     
     return _session_service
 
+def close_session_service() -> None:
+    """Release the session service's database connections"""
+    global _session_service
+    
+    if _session_service is not None:
+        _session_service.close()
+        _session_service = None
+
 def get_answer_validation_service() -> AnswerValidationService:
     """Dependency to get answer validation service instance"""
     global _answer_validation_service
@@ -6,7 +6,7 @@ Wraps the existing DatabaseManager for use in the FastAPI app
 import sys
 import json
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Any
 from datetime import datetime, timedelta
 import uuid
 
@@ -19,9 +19,21 @@ class DatabaseManager(BaseDBManager):
     """Extended DatabaseManager with additional app-specific methods"""
     
     def __init__(self, db_path: str = "quiz_generator.db"):
+        # Called with the session ID (None when many sessions change) after
+        # every write to quiz_sessions, so in-process caches can evict
+        self._session_listeners: List[Callable[[Optional[str]], None]] = []
         super().__init__(db_path)
         print(f"📊 Database initialized: {db_path}")
     
+    def add_session_listener(self, listener: Callable[[Optional[str]], None]) -> None:
+        """Register a callback run after any session row is written"""
+        self._session_listeners.append(listener)
+    
+    def _notify_session_change(self, session_id: Optional[str]) -> None:
+        """Tell registered listeners that a session row changed"""
+        for listener in self._session_listeners:
+            listener(session_id)
+    
     def health_check(self) -> bool:
         """Check if database is accessible"""
         try:
@@ -60,6 +72,7 @@ class DatabaseManager(BaseDBManager):
         
         conn.commit()
         conn.close()
+        self._notify_session_change(session_id)
         
         return {
             'session_id': session_id,
@@ -148,6 +161,7 @@ class DatabaseManager(BaseDBManager):
         
         conn.commit()
         conn.close()
+        self._notify_session_change(session_id)
         
         return cursor.rowcount > 0
     
@@ -166,6 +180,7 @@ class DatabaseManager(BaseDBManager):
         deleted_count = cursor.rowcount
         conn.commit()
         conn.close()
+        self._notify_session_change(None)
         
         return deleted_count
     
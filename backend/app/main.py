@@ -16,7 +16,7 @@ from app.core.config import Settings
 from app.core.database import DatabaseManager
 from app.core.dependencies import get_database_manager, get_settings
 from app.api.langchain_routes import router as langchain_router
-from app.api.session_routes import router as session_router
+from app.api.session_routes import router as session_router, close_session_service
 from app.api.feedback_routes import router as feedback_router
 from services.langchain_rag_service import LangChainRAGService
 
@@ -69,6 +69,7 @@ async def lifespan(app: FastAPI):
     # Close connections if needed
     if rag_service and hasattr(rag_service, 'cleanup'):
         rag_service.cleanup()
+    close_session_service()
     print("✅ Application shutdown complete!")
 
 # Create FastAPI app
@@ -388,9 +388,14 @@ class DatabaseManager:
         conn = self.get_connection()
         cursor = conn.cursor()
         
+        # WAL is stored in the database file, so setting it once here covers
+        # every later connection; readers no longer block on writers
+        cursor.execute("PRAGMA journal_mode = WAL")
+        
         # Create all tables
         self._create_documents_table(cursor)
         self._create_document_chunks_table(cursor)
+        self._create_document_chunks_fts_table(cursor)
         self._create_learning_objectives_table(cursor)
         self._create_quiz_sessions_table(cursor)
         self._create_generated_quizzes_table(cursor)
@@ -449,6 +454,47 @@ class DatabaseManager:
             )
         """)
     
+    def _create_document_chunks_fts_table(self, cursor):
+        """Full-text index over chunk content for the database search fallback."""
+        cursor.execute("""
+            SELECT name FROM sqlite_master
+            WHERE type = 'table' AND name = 'document_chunks_fts'
+        """)
+        exists = cursor.fetchone() is not None
+        
+        cursor.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS document_chunks_fts
+            USING fts5(content, content='document_chunks', content_rowid='id')
+        """)
+        
+        # Keep the external-content index in sync with document_chunks
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS document_chunks_fts_ai AFTER INSERT ON document_chunks BEGIN
+                INSERT INTO document_chunks_fts(rowid, content) VALUES (new.id, new.content);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS document_chunks_fts_ad AFTER DELETE ON document_chunks BEGIN
+                INSERT INTO document_chunks_fts(document_chunks_fts, rowid, content)
+                VALUES ('delete', old.id, old.content);
+            END
+        """)
+        # Only re-index when the text changes; embedding backfills update
+        # other columns. Recreated so databases with the older any-column
+        # trigger pick this up.
+        cursor.execute("DROP TRIGGER IF EXISTS document_chunks_fts_au")
+        cursor.execute("""
+            CREATE TRIGGER document_chunks_fts_au AFTER UPDATE OF content ON document_chunks BEGIN
+                INSERT INTO document_chunks_fts(document_chunks_fts, rowid, content)
+                VALUES ('delete', old.id, old.content);
+                INSERT INTO document_chunks_fts(rowid, content) VALUES (new.id, new.content);
+            END
+        """)
+        
+        # Index chunks that were stored before the FTS table existed
+        if not exists:
+            cursor.execute("INSERT INTO document_chunks_fts(document_chunks_fts) VALUES ('rebuild')")
+    
     def _create_learning_objectives_table(self, cursor):
         """Store extracted learning objectives."""
         cursor.execute("""
@@ -4,17 +4,30 @@ Implements proper document loading, chunking, and RAG operations
 """
 
 import os
+import re
+import queue
+import asyncio
+import atexit
+import threading
 import json
+import heapq
 import logging
 from typing import List, Dict, Any, Optional, Union
 from pathlib import Path
 from datetime import datetime
+import numpy as np
 import weaviate
-from weaviate.classes.init import Auth
+from weaviate.classes.init import Auth, AdditionalConfig, Timeout
 from weaviate.classes.query import MetadataQuery
-from weaviate.classes.config import Configure
+from weaviate.classes.config import Configure, Property, DataType
 import redis
 
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
 # LangChain imports
 from langchain.schema import Document
 from langchain_core.retrievers import BaseRetriever
@@ -23,7 +36,6 @@ from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_community.retrievers import BM25Retriever
 from langchain_weaviate.vectorstores import WeaviateVectorStore
-from langchain.retrievers.document_compressors.cross_encoder_rerank import CrossEncoderReranker
 from sentence_transformers import CrossEncoder
 
 # Document loaders
@@ -43,6 +55,33 @@ from services.init_db import DatabaseManager
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+_JSON_DECODER = json.JSONDecoder()
+# Opening braces tried as the start of the quiz object before giving up, so
+# output full of stray braces can't make parsing quadratic
+_MAX_JSON_START_ATTEMPTS = 8
+
+# Number of results kept after cross-encoder reranking
+RERANK_TOP_N = 3
+
+# Chunks sized to stay under MiniLM's 256 word-piece input limit, so the
+# embedding covers the whole chunk instead of a silently truncated prefix
+CHUNK_SIZE = 512
+CHUNK_OVERLAP = 64
+
+_BM25_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def _bm25_tokenize(text: str) -> List[str]:
+    """Lowercase word tokenizer for BM25, backed by a compiled C regex"""
+    return _BM25_TOKEN_PATTERN.findall(text.lower())
+
+
+def _content_fingerprint(content: str) -> int:
+    """Return a compact integer fingerprint for deduplicating chunk content"""
+    if XXHASH_AVAILABLE:
+        return xxhash.xxh3_64_intdigest(content.encode())
+    return hash(content)
+
 class LangChainRAGService:
     def __init__(self, db_manager: DatabaseManager, 
                  weaviate_config: Optional[Dict[str, Any]] = None,
@@ -53,18 +92,74 @@ class LangChainRAGService:
         self.redis_config = redis_config
         self.google_api_key = google_api_key
         self.logger = logging.getLogger(__name__)
-        self.weaviate_client = None
-        # Initialize components
-        self.embeddings = self._init_embeddings()
-        self.llm = self._init_llm()
+        self._weaviate_client = None
+        # Embeddings, LLM, vector store and reranker are loaded on first use
+        # so workers only pay for the models their requests actually need
+        self._init_lock = threading.RLock()
+        # Caps concurrent in-flight LLM calls from the async code paths; the
+        # semaphore is created inside the running loop on first use
+        self._llm_concurrency = int(os.environ.get("LLM_CONCURRENCY", 16))
+        self._llm_semaphore: Optional[asyncio.Semaphore] = None
+        self._llm_semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
         self.text_splitter = self._init_text_splitter()
-        self.vector_store = self._init_vector_store(weaviate_config)
         self.bm25_retriever = None
-        self.reranker = None
+        self._bm25_token_cache: Dict[int, List[str]] = {}
+        self._document_cache: Dict[int, Document] = {}
+        self._local_vectors: Optional[np.ndarray] = None
+        self._local_documents: List[Document] = []
         self.redis_client = self._init_redis(redis_config)
         
+        # Cache writes are off the request path: a daemon thread drains the
+        # queue and flushes batches through a single pipeline round-trip
+        self._cache_queue: queue.Queue = queue.Queue()
+        if self.redis_client:
+            threading.Thread(target=self._drain_cache_writes, daemon=True).start()
+        
         print("✅ Enhanced LangChain RAG Service initialized successfully!")
     
+    def _lazy_init(self, name: str, factory):
+        """Build a lazily initialized component exactly once across threads
+        
+        The service-level RLock is the only lock involved, so components that
+        build other components (vector_store -> embeddings) can't deadlock.
+        """
+        if name in self.__dict__:
+            return self.__dict__[name]
+        with self._init_lock:
+            if name not in self.__dict__:
+                self.__dict__[name] = factory()
+            return self.__dict__[name]
+    
+    def _llm_limiter(self) -> asyncio.Semaphore:
+        """Semaphore limiting concurrent LLM calls, bound to the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._llm_semaphore_loop is not loop:
+            self._llm_semaphore = asyncio.Semaphore(self._llm_concurrency)
+            self._llm_semaphore_loop = loop
+        return self._llm_semaphore
+    
+    @property
+    def embeddings(self):
+        return self._lazy_init("embeddings", self._init_embeddings)
+    
+    @property
+    def llm(self):
+        return self._lazy_init("llm", self._init_llm)
+    
+    @property
+    def vector_store(self):
+        return self._lazy_init("vector_store", lambda: self._init_vector_store(self.weaviate_config))
+    
+    @property
+    def weaviate_client(self):
+        """Weaviate client, connected along with the lazily built vector store"""
+        self.vector_store
+        return self._weaviate_client
+    
+    @property
+    def reranker(self):
+        return self._lazy_init("reranker", self._init_reranker)
+    
     def _init_embeddings(self):
         """Initialize HuggingFace embeddings"""
         try:
@@ -95,8 +190,8 @@ class LangChainRAGService:
     def _init_text_splitter(self):
         """Initialize text splitter for chunking"""
         return RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200,
+            chunk_size=CHUNK_SIZE,
+            chunk_overlap=CHUNK_OVERLAP,
             length_function=len,
             separators=["\n\n", "\n", " ", ""]
         )
@@ -105,10 +200,17 @@ class LangChainRAGService:
         """Initialize LangChain vector store"""
         if weaviate_config:
             try:
+                # One long-lived client per service: queries go over the
+                # persistent gRPC channel and uploads get a longer insert timeout
+                additional_config = AdditionalConfig(
+                    timeout=Timeout(query=30, insert=120)
+                )
+                
                 if weaviate_config.get("cluster_url") and weaviate_config.get("auth_credentials"):
                     client = weaviate.connect_to_weaviate_cloud(
                         cluster_url=weaviate_config["cluster_url"],
-                        auth_credentials=Auth.api_key(weaviate_config["auth_credentials"])
+                        auth_credentials=Auth.api_key(weaviate_config["auth_credentials"]),
+                        additional_config=additional_config
                     )
                     print("🌩️  Connecting to Weaviate Cloud...")
                 else:
@@ -124,7 +226,8 @@ class LangChainRAGService:
                     client = weaviate.connect_to_local(
                         host=host,
                         port=port,
-                        grpc_port=weaviate_config.get("grpc_port", 50051)
+                        grpc_port=weaviate_config.get("grpc_port", 50051),
+                        additional_config=additional_config
                     )
                     print("🏠 Connecting to local Weaviate...")
                 
@@ -132,6 +235,9 @@ class LangChainRAGService:
                     raise ConnectionError("Weaviate client is not ready")
                 
                 print("✅ Weaviate connection established")
+                self._weaviate_client = client
+                atexit.register(client.close)
+                self._ensure_collection(client)
                 
                 vector_store = WeaviateVectorStore(
                     client=client,
@@ -150,6 +256,23 @@ class LangChainRAGService:
             print("⚠️  No Weaviate configuration provided. Vector search disabled.")
             return None
     
+    def _ensure_collection(self, client):
+        """Create the chunk collection with a scalar-quantized HNSW index"""
+        if client.collections.exists("DocumentChunks"):
+            return
+        
+        # SQ stores vectors as int8 codes once trained, cutting index memory
+        # and distance cost ~4x versus float32 with little recall loss on MiniLM
+        client.collections.create(
+            "DocumentChunks",
+            properties=[Property(name="content", data_type=DataType.TEXT)],
+            vectorizer_config=Configure.Vectorizer.none(),
+            vector_index_config=Configure.VectorIndex.hnsw(
+                quantizer=Configure.VectorIndex.Quantizer.sq()
+            )
+        )
+        print("📦 Created DocumentChunks collection with scalar quantization")
+    
     def _init_bm25_retriever(self):
         """Initialize BM25 retriever"""
         try:
@@ -157,18 +280,41 @@ class LangChainRAGService:
             if not documents:
                 self.logger.warning("No documents found for BM25 retriever")
                 return None
+            
+            # Reuse tokens for chunks whose content was already indexed so a
+            # rebuild after an upload only tokenizes the new chunks
+            token_cache = {}
+            for doc in documents:
+                key = _content_fingerprint(doc.page_content)
+                tokens = self._bm25_token_cache.get(key)
+                token_cache[key] = tokens if tokens is not None else _bm25_tokenize(doc.page_content)
+            self._bm25_token_cache = token_cache
                 
-            return BM25Retriever.from_documents(documents)
+            return BM25Retriever.from_documents(documents, preprocess_func=self._bm25_preprocess)
         except Exception as e:
             self.logger.error(f"Failed to initialize BM25 retriever: {e}")
             return None
     
+    def _bm25_preprocess(self, text: str) -> List[str]:
+        """Tokenize for BM25, serving indexed chunks from the token cache"""
+        tokens = self._bm25_token_cache.get(_content_fingerprint(text))
+        if tokens is not None:
+            return tokens
+        return _bm25_tokenize(text)
+    
     def _init_reranker(self):
         """Initialize cross-encoder reranker."""
         try:
-            reranker = CrossEncoderReranker(
-                model_name="cross-encoder/ms-marco-MiniLM-L-6-v2",
-                top_n=3
+            import torch
+            
+            # Half precision only pays off on GPU; CPU kernels stay in FP32
+            automodel_args = {}
+            if torch.cuda.is_available():
+                automodel_args["torch_dtype"] = torch.float16
+            
+            reranker = CrossEncoder(
+                "cross-encoder/ms-marco-MiniLM-L-6-v2",
+                automodel_args=automodel_args
             )
             return reranker
         except Exception as e:
@@ -193,11 +339,35 @@ class LangChainRAGService:
             self.logger.error(f"Failed to initialize Redis: {e}")
             return None
         
+    def _cache_result(self, key: str, ttl: int, value: str):
+        """Queue a cache write for the background writer"""
+        if self.redis_client:
+            self._cache_queue.put_nowait((key, ttl, value))
+    
+    def _drain_cache_writes(self, max_batch: int = 64):
+        """Flush queued cache writes to Redis in pipelined batches"""
+        while True:
+            items = [self._cache_queue.get()]
+            while len(items) < max_batch:
+                try:
+                    items.append(self._cache_queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            try:
+                pipe = self.redis_client.pipeline(transaction=False)
+                for key, ttl, value in items:
+                    pipe.setex(key, ttl, value)
+                pipe.execute()
+            except Exception as e:
+                self.logger.error(f"Background cache write failed: {e}")
+    
     def cleanup(self):
         """Clean up resources on shutdown"""
         try:
-            if self.weaviate_client:
-                self.weaviate_client.close()
+            # Only close a client that was actually opened
+            if self._weaviate_client:
+                self._weaviate_client.close()
                 print("🧹 Weaviate client closed")
             
             if self.redis_client:
@@ -295,21 +465,27 @@ class LangChainRAGService:
                 doc = Document(page_content=chunk, metadata=metadata)
                 chunk_documents.append(doc)
             
-            # Step 6: Add to vector store
+            # Step 6: Embed the chunks once and add them to the vector store
             vector_success = False
             vectors_created = 0
             
-            if self.vector_store:
+            try:
+                chunk_vectors = self.embeddings.embed_documents([doc.page_content for doc in chunk_documents])
+            except Exception as e:
+                self.logger.error(f"Chunk embedding failed: {e}")
+                chunk_vectors = None
+            
+            if self.vector_store and chunk_vectors:
                 try:
-                    self.vector_store.add_documents(chunk_documents)
-                    vector_success = True
-                    vectors_created = len(chunk_documents)
+                    vectors_created = self._add_documents_to_weaviate(chunk_documents, chunk_vectors)
+                    vector_success = vectors_created > 0
                     self.logger.info(f"Added {vectors_created} vectors to Weaviate")
                 except Exception as e:
                     self.logger.error(f"Vector store addition failed: {e}")
             
             # Step 7: Store in database for BM25 retrieval
-            self._store_document_chunks(document_id, chunk_documents, chunk_size=len(chunks))
+            self._store_document_chunks(document_id, chunk_documents, chunk_size=len(chunks),
+                                        vectors=chunk_vectors)
             
             # Step 8: Update document record
             self._update_document_record(
@@ -321,8 +497,9 @@ class LangChainRAGService:
                 learning_objectives=learning_objectives
             )
             
-            # Step 9: Refresh BM25 retriever
+            # Step 9: Refresh BM25 retriever and extend the local vector index
             self.bm25_retriever = self._init_bm25_retriever()
+            self._extend_local_index(chunk_documents, chunk_vectors)
             
             # Step 10: Return comprehensive result
             return {
@@ -339,8 +516,8 @@ class LangChainRAGService:
                 "processing_details": {
                     "file_type": file_ext,
                     "loader_used": loader.__class__.__name__ if 'loader' in locals() else "text_fallback",
-                    "chunk_size": 1000,
-                    "chunk_overlap": 200
+                    "chunk_size": CHUNK_SIZE,
+                    "chunk_overlap": CHUNK_OVERLAP
                 },
                 "status": "processed" if vector_success else "partial"
             }
@@ -365,6 +542,23 @@ class LangChainRAGService:
                 "status": "failed"
             }
     
+    def _add_documents_to_weaviate(self, chunk_documents: List[Document], vectors: List[List[float]],
+                                   batch_size: int = 200) -> int:
+        """Upsert pre-embedded chunks through fixed-size gRPC batches"""
+        with self.weaviate_client.batch.fixed_size(batch_size=batch_size) as batch:
+            for doc, vector in zip(chunk_documents, vectors):
+                batch.add_object(
+                    collection="DocumentChunks",
+                    properties={"content": doc.page_content, **doc.metadata},
+                    vector=vector
+                )
+        
+        failed_objects = self.weaviate_client.batch.failed_objects
+        if failed_objects:
+            self.logger.error(f"{len(failed_objects)} chunks failed to upload to Weaviate")
+        
+        return len(chunk_documents) - len(failed_objects)
+    
     def _read_file_with_fallback(self, file_path: str) -> str:
         """Read file with multiple encoding attempts"""
         encodings = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']
@@ -378,8 +572,9 @@ class LangChainRAGService:
         
         raise ValueError(f"Could not decode file with any encoding: {encodings}")
     
-    def _store_document_chunks(self, document_id: int, chunk_documents: List[Document], chunk_size: int):
-        """Store document chunks in database"""
+    def _store_document_chunks(self, document_id: int, chunk_documents: List[Document], chunk_size: int,
+                               vectors: Optional[List[List[float]]] = None):
+        """Store document chunks, with their embeddings when available, in database"""
         try:
             with self.db_manager.get_connection() as conn:
                 cursor = conn.cursor()
@@ -393,16 +588,24 @@ class LangChainRAGService:
                 """, (full_content, json.dumps(chunk_documents[0].metadata), document_id))
                 
                 # Then store individual chunks
-                for doc in chunk_documents:
+                # Upsert rather than REPLACE: REPLACE's implicit delete skips
+                # the FTS delete trigger and leaves stale index entries behind
+                for i, doc in enumerate(chunk_documents):
                     cursor.execute("""
-                        INSERT OR REPLACE INTO document_chunks 
-                        (document_id, chunk_index, content, chunk_size, chunk_metadata)
-                        VALUES (?, ?, ?, ?, ?)
+                        INSERT INTO document_chunks 
+                        (document_id, chunk_index, content, chunk_size, embedding_vector, chunk_metadata)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                        ON CONFLICT(document_id, chunk_index) DO UPDATE SET
+                            content = excluded.content,
+                            chunk_size = excluded.chunk_size,
+                            embedding_vector = excluded.embedding_vector,
+                            chunk_metadata = excluded.chunk_metadata
                     """, (
                         document_id,
                         doc.metadata.get('chunk_index', 0),
                         doc.page_content,
                         chunk_size,
+                        json.dumps(vectors[i]) if vectors else None,
                         json.dumps(doc.metadata)
                     ))
                 
@@ -480,26 +683,33 @@ class LangChainRAGService:
             with self.db_manager.get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
-                    SELECT content, chunk_metadata
+                    SELECT id, content, chunk_metadata
                     FROM document_chunks 
                     WHERE content IS NOT NULL AND content != ''
                 """)
                 
+                # Reuse Documents built on earlier BM25 rebuilds; chunk rows are
+                # replaced rather than edited in place, so the row id is stable
                 documents = []
+                document_cache = {}
                 for row in cursor.fetchall():
-                    metadata = {}
-                    if row[1]:
-                        try:
-                            metadata = json.loads(row[1])
-                        except:
-                            metadata = {}
-                    
-                    doc = Document(
-                        page_content=row[0],
-                        metadata=metadata
-                    )
+                    doc = self._document_cache.get(row[0])
+                    if doc is None:
+                        metadata = {}
+                        if row[2]:
+                            try:
+                                metadata = json.loads(row[2])
+                            except:
+                                metadata = {}
+                        
+                        doc = Document(
+                            page_content=row[1],
+                            metadata=metadata
+                        )
+                    document_cache[row[0]] = doc
                     documents.append(doc)
                 
+                self._document_cache = document_cache
                 return documents
         except Exception as e:
             self.logger.error(f"Error retrieving documents from database: {e}")
@@ -511,9 +721,18 @@ class LangChainRAGService:
         try:
             results = []
             
+            # Embed the query once and hand the vector to Weaviate directly so
+            # the vector store does not re-embed the same string internally
+            query_vector = None
+            if method in ("vector", "hybrid"):
+                query_vector = self.embeddings.embed_query(query)
+            
             if method == "vector" and self.vector_store:
-                docs = self.vector_store.similarity_search(query, k=top_k)
+                docs = self.vector_store.similarity_search_by_vector(query_vector, k=top_k)
                 results = self._format_search_results(docs, "vector")
+            
+            elif method == "vector":
+                results = self._numpy_search(query_vector, top_k)
                 
             elif method == "bm25" and self.bm25_retriever:
                 if self.bm25_retriever is None:
@@ -524,28 +743,36 @@ class LangChainRAGService:
                     results = self._format_search_results(docs, "bm25")
                 
             elif method == "hybrid":
-                vector_results = []
-                bm25_results = []
+                hybrid_results = None
+                if self.weaviate_client:
+                    hybrid_results = self._weaviate_hybrid_search(query, query_vector, top_k)
                 
-                if self.vector_store:
-                    vector_docs = self.vector_store.similarity_search(query, k=top_k)
-                    vector_results = self._format_search_results(vector_docs, "vector")
+                if hybrid_results is not None:
+                    results = hybrid_results
+                else:
+                    # Weaviate is down or the hybrid query failed: merge client-side
+                    vector_results = []
+                    bm25_results = []
+                    
+                    if self.vector_store:
+                        vector_docs = self.vector_store.similarity_search_by_vector(query_vector, k=top_k)
+                        vector_results = self._format_search_results(vector_docs, "vector")
+                    else:
+                        vector_results = self._numpy_search(query_vector, top_k)
 
-                if self.bm25_retriever is None:
-                    self.bm25_retriever = self._init_bm25_retriever()
+                    if self.bm25_retriever is None:
+                        self.bm25_retriever = self._init_bm25_retriever()
+                        
+                    if self.bm25_retriever:
+                        bm25_docs = self.bm25_retriever.get_relevant_documents(query)[:top_k]
+                        bm25_results = self._format_search_results(bm25_docs, "bm25")
                     
-                if self.bm25_retriever:
-                    bm25_docs = self.bm25_retriever.get_relevant_documents(query)[:top_k]
-                    bm25_results = self._format_search_results(bm25_docs, "bm25")
-                
-                results = self._combine_results(vector_results, bm25_results, top_k)
+                    results = self._combine_results(vector_results, bm25_results, top_k)
                 
             else:
                 results = self._database_search(query, top_k)
             
             if results:
-                if self.reranker is None:
-                    self.reranker = self._init_reranker()
                 if self.reranker:
                     results = self._rerank_results(query, results)
             
@@ -555,6 +782,116 @@ class LangChainRAGService:
             logger.error(f"Search error: {e}")
             return []
     
+    def _weaviate_hybrid_search(self, query: str, query_vector: Optional[List[float]],
+                                top_k: int, alpha: float = 0.5) -> Optional[List[Dict[str, Any]]]:
+        """Run vector + BM25 fusion inside Weaviate in a single round-trip"""
+        try:
+            collection = self.weaviate_client.collections.get("DocumentChunks")
+            response = collection.query.hybrid(
+                query=query,
+                vector=query_vector,
+                alpha=alpha,
+                limit=top_k,
+                return_metadata=MetadataQuery(score=True)
+            )
+            
+            results = []
+            for obj in response.objects:
+                metadata = dict(obj.properties)
+                content = metadata.pop("content", "")
+                results.append({
+                    "content": content,
+                    "metadata": metadata,
+                    "method": "hybrid",
+                    "score": obj.metadata.score or 0.0
+                })
+            return results
+            
+        except Exception as e:
+            logger.warning(f"Weaviate hybrid search failed, falling back to client-side merge: {e}")
+            return None
+    
+    def _init_local_index(self):
+        """Load chunk embeddings into one contiguous matrix for in-process search"""
+        try:
+            with self.db_manager.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT id, content, chunk_metadata, embedding_vector
+                    FROM document_chunks
+                    WHERE content IS NOT NULL AND content != ''
+                """)
+                rows = cursor.fetchall()
+                
+                # Embed chunks stored without a vector once and persist them
+                new_vectors = {}
+                missing = [row for row in rows if not row[3]]
+                if missing:
+                    embedded = self.embeddings.embed_documents([row[1] for row in missing])
+                    new_vectors = {row[0]: vector for row, vector in zip(missing, embedded)}
+                    cursor.executemany(
+                        "UPDATE document_chunks SET embedding_vector = ? WHERE id = ?",
+                        [(json.dumps(vector), chunk_id) for chunk_id, vector in new_vectors.items()]
+                    )
+                    conn.commit()
+            
+            documents = []
+            vectors = []
+            for row in rows:
+                vectors.append(new_vectors[row[0]] if row[0] in new_vectors else json.loads(row[3]))
+                documents.append(Document(
+                    page_content=row[1],
+                    metadata=json.loads(row[2]) if row[2] else {}
+                ))
+            
+            self._local_documents = documents
+            if vectors:
+                # Embeddings are L2-normalized, so a dot product is the cosine
+                self._local_vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+            else:
+                self._local_vectors = None
+                
+        except Exception as e:
+            self.logger.error(f"Failed to build local vector index: {e}")
+            self._local_vectors = None
+    
+    def _extend_local_index(self, chunk_documents: List[Document], vectors: Optional[List[List[float]]]):
+        """Append freshly ingested chunks to the loaded local index"""
+        if self._local_vectors is None:
+            # Not loaded yet; the first fallback search reads the new rows too
+            return
+        if not vectors:
+            # Without vectors the rows are embedded on the next full load
+            self._local_vectors = None
+            return
+        
+        # Extend the documents first so indices from a concurrent search stay valid
+        self._local_documents = self._local_documents + chunk_documents
+        self._local_vectors = np.vstack([self._local_vectors, np.asarray(vectors, dtype=np.float32)])
+    
+    def _numpy_search(self, query_vector: List[float], top_k: int) -> List[Dict[str, Any]]:
+        """Cosine top-k over in-memory chunk embeddings when Weaviate is unavailable"""
+        if self._local_vectors is None:
+            self._init_local_index()
+        if self._local_vectors is None:
+            return []
+        
+        scores = self._local_vectors @ np.asarray(query_vector, dtype=np.float32)
+        k = min(top_k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        
+        results = []
+        for i in top:
+            doc = self._local_documents[i]
+            results.append({
+                "content": doc.page_content,
+                "metadata": doc.metadata,
+                "method": "vector_local",
+                "score": float(scores[i])
+            })
+        return results
+    
     def _format_search_results(self, docs: List[Document], method: str) -> List[Dict[str, Any]]:
         """Format search results consistently"""
         results = []
@@ -570,31 +907,42 @@ class LangChainRAGService:
     
     def _combine_results(self, vector_results: List[Dict], bm25_results: List[Dict], top_k: int) -> List[Dict]:
         """Combine and deduplicate results"""
-        combined = {}
+        # Key on an 8-byte fingerprint instead of the full chunk text; the
+        # content prefix guards against fingerprint collisions
+        combined: Dict[Any, Dict] = {}
         
         for result in vector_results:
-            content = result["content"]
-            combined[content] = result
+            combined[_content_fingerprint(result["content"])] = result
         
         for result in bm25_results:
-            content = result["content"]
-            if content not in combined:
-                combined[content] = result
+            key = _content_fingerprint(result["content"])
+            existing = combined.get(key)
+            if existing is None:
+                combined[key] = result
+            elif existing["content"][:64] != result["content"][:64]:
+                combined[(key, result["content"][:64])] = result
         
-        sorted_results = sorted(combined.values(), key=lambda x: x.get("score", 0), reverse=True)
-        return sorted_results[:top_k]
+        return heapq.nlargest(top_k, combined.values(), key=lambda x: x.get("score", 0))
     
     def _database_search(self, query: str, top_k: int) -> List[Dict[str, Any]]:
-        """Fallback database search"""
+        """Fallback database search using the FTS5 index with BM25 ranking"""
+        # Quote each term so user input cannot be parsed as FTS5 query syntax
+        terms = re.findall(r"\w+", query)
+        if not terms:
+            return []
+        match_query = " OR ".join(f'"{term}"' for term in terms)
+        
         try:
             with self.db_manager.get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
-                    SELECT content, chunk_metadata 
-                    FROM document_chunks 
-                    WHERE content LIKE ?
+                    SELECT c.content, c.chunk_metadata, bm25(document_chunks_fts) AS rank
+                    FROM document_chunks_fts
+                    JOIN document_chunks c ON c.id = document_chunks_fts.rowid
+                    WHERE document_chunks_fts MATCH ?
+                    ORDER BY rank
                     LIMIT ?
-                """, (f"%{query}%", top_k))
+                """, (match_query, top_k))
                 
                 results = []
                 for row in cursor.fetchall():
@@ -602,7 +950,7 @@ class LangChainRAGService:
                         "content": row[0],
                         "metadata": json.loads(row[1]) if row[1] else {},
                         "method": "database",
-                        "score": 0.5
+                        "score": -row[2]
                     })
                 
                 return results
@@ -616,41 +964,33 @@ class LangChainRAGService:
             if not self.reranker or len(results) <= 1:
                 return results
             
-            documents = []
-            for result in results:
-                doc = Document(
-                    page_content=result["content"],
-                    metadata=result["metadata"]
-                )
-                documents.append(doc)
-            
-            reranked_docs = self.reranker.compress_documents(documents, query)
+            # Score all (query, passage) pairs in padded batches in one call
+            scores = self.reranker.predict(
+                [(query, result["content"]) for result in results],
+                batch_size=32,
+                convert_to_numpy=True,
+                show_progress_bar=False
+            )
             
-            reranked_results = []
-            for doc in reranked_docs:
-                result = {
-                    "content": doc.page_content,
-                    "metadata": doc.metadata,
-                    "method": "reranked",
-                    "score": doc.metadata.get("relevance_score", 0.0)
-                }
-                reranked_results.append(result)
+            # Update the existing result dicts rather than rebuilding them
+            for result, score in zip(results, scores):
+                result["score"] = float(score)
+                result["method"] = "reranked"
             
-            return reranked_results
+            return heapq.nlargest(RERANK_TOP_N, results, key=lambda result: result["score"])
             
         except Exception as e:
             logger.error(f"Reranking error: {e}")
             return results
     
-    def generate_answer(self, query: str, context: List[Dict[str, Any]]) -> str:
-        """Generate answer using LLM with retrieved context"""
-        try:
-            context_str = "\n\n".join([
-                f"Document {i+1}: {doc['content']}"
-                for i, doc in enumerate(context[:3])
-            ])
-            
-            prompt = f"""Based on the following context, please answer the question. If the answer is not in the context, say "I don't have enough information to answer this question."
+    def _build_answer_prompt(self, query: str, context: List[Dict[str, Any]]) -> str:
+        """Build the answer prompt from retrieved context"""
+        context_str = "\n\n".join([
+            f"Document {i+1}: {doc['content']}"
+            for i, doc in enumerate(context[:3])
+        ])
+        
+        return f"""Based on the following context, please answer the question. If the answer is not in the context, say "I don't have enough information to answer this question."
 
             Context:
             {context_str}
@@ -658,7 +998,11 @@ class LangChainRAGService:
             Question: {query}
 
             Answer:"""
-            
+    
+    def generate_answer(self, query: str, context: List[Dict[str, Any]]) -> str:
+        """Generate answer using LLM with retrieved context"""
+        try:
+            prompt = self._build_answer_prompt(query, context)
             response = self.llm.invoke(prompt)
             return response.content
             
@@ -666,6 +1010,18 @@ class LangChainRAGService:
             logger.error(f"Answer generation error: {e}")
             return "I apologize, but I encountered an error while generating the answer."
     
+    async def agenerate_answer(self, query: str, context: List[Dict[str, Any]]) -> str:
+        """Async variant of generate_answer that does not block the event loop"""
+        try:
+            prompt = self._build_answer_prompt(query, context)
+            async with self._llm_limiter():
+                response = await self.llm.ainvoke(prompt)
+            return response.content
+            
+        except Exception as e:
+            logger.error(f"Answer generation error: {e}")
+            return "I apologize, but I encountered an error while generating the answer."
+    
     def generate_quiz(self, topic: str, question_count: int = 5, difficulty: str = "medium") -> Dict[str, Any]:
         """Generate a quiz based on the given topic using hybrid RAG
         
@@ -677,6 +1033,41 @@ class LangChainRAGService:
         Returns:
             Dictionary containing quiz data
         """
+        cached_quiz = self._get_cached_quiz(topic, question_count, difficulty)
+        if cached_quiz:
+            return cached_quiz
+        
+        prompt = self._build_quiz_prompt(topic, question_count, difficulty)
+        
+        try:
+            # Generate quiz using LLM
+            response = self.llm.invoke(prompt)
+            return self._finalize_quiz(response.content, topic, question_count, difficulty)
+            
+        except Exception as e:
+            self.logger.error(f"Error generating quiz: {e}")
+            raise
+    
+    async def agenerate_quiz(self, topic: str, question_count: int = 5, difficulty: str = "medium") -> Dict[str, Any]:
+        """Async variant of generate_quiz; retrieval runs in a worker thread and
+        the LLM call is awaited under the shared concurrency limit"""
+        cached_quiz = await asyncio.to_thread(self._get_cached_quiz, topic, question_count, difficulty)
+        if cached_quiz:
+            return cached_quiz
+        
+        prompt = await asyncio.to_thread(self._build_quiz_prompt, topic, question_count, difficulty)
+        
+        try:
+            async with self._llm_limiter():
+                response = await self.llm.ainvoke(prompt)
+            return self._finalize_quiz(response.content, topic, question_count, difficulty)
+            
+        except Exception as e:
+            self.logger.error(f"Error generating quiz: {e}")
+            raise
+    
+    def _get_cached_quiz(self, topic: str, question_count: int, difficulty: str) -> Optional[Dict[str, Any]]:
+        """Return a previously generated quiz from Redis, if any"""
         # Check cache first if Redis is available
         if self.redis_client:
             cache_key = f"quiz:{topic}:{question_count}:{difficulty}"
@@ -689,7 +1080,10 @@ class LangChainRAGService:
                     return quiz_data
                 except Exception as e:
                     self.logger.error(f"Error parsing cached quiz: {e}")
-        
+        return None
+    
+    def _build_quiz_prompt(self, topic: str, question_count: int, difficulty: str) -> str:
+        """Retrieve context for the topic and build the quiz generation prompt"""
         # Retrieve relevant context using hybrid search
         search_results = self.search(
             query=f"educational content about {topic}",
@@ -720,7 +1114,7 @@ class LangChainRAGService:
         selected_types = question_types.get(difficulty.lower(), question_types["medium"])
         question_types_str = ", ".join(selected_types)
         
-        prompt = f"""You are an expert educational assessment creator. Create a quiz on the topic of '{topic}' with {question_count} questions at {difficulty} difficulty level ({difficulty_desc}).
+        return f"""You are an expert educational assessment creator. Create a quiz on the topic of '{topic}' with {question_count} questions at {difficulty} difficulty level ({difficulty_desc}).
 
         Use the following educational content as reference:
         {context_str}
@@ -752,57 +1146,70 @@ class LangChainRAGService:
 
         Ensure the questions are directly based on the provided context and are appropriate for the {difficulty} difficulty level.
         """
+    
+    def _finalize_quiz(self, quiz_content: str, topic: str, question_count: int, difficulty: str) -> Dict[str, Any]:
+        """Parse the LLM quiz response, stamp metadata and queue it for caching"""
+        # Parse JSON response
+        quiz_data = self._parse_json_response(quiz_content)
+        
+        # Add metadata
+        quiz_data["cached"] = False
+        quiz_data["generated_at"] = str(datetime.now())
+        
+        # Cache the result if Redis is available
+        if self.redis_client:
+            cache_key = f"quiz:{topic}:{question_count}:{difficulty}"
+            # Expire after 24 hours
+            self._cache_result(cache_key, 86400, json.dumps(quiz_data))
+            self.logger.info(f"Queued quiz cache write for topic: {topic}")
         
+        return quiz_data
+    
+    def _parse_json_response(self, content: str) -> Dict[str, Any]:
+        """Parse a JSON object from LLM output, tolerating surrounding text"""
         try:
-            # Generate quiz using LLM
-            response = self.llm.invoke(prompt)
-            quiz_content = response.content
-            
-            # Parse JSON response
+            return json.loads(content)
+        except json.JSONDecodeError:
+            pass
+        
+        # raw_decode stops at the end of the object, so trailing text or code
+        # fences are ignored. If a brace in leading prose isn't the object,
+        # retry from the next one, up to a small fixed number of attempts.
+        start = content.find("{")
+        for _ in range(_MAX_JSON_START_ATTEMPTS):
+            if start == -1:
+                break
             try:
-                quiz_data = json.loads(quiz_content)
+                quiz_data, _ = _JSON_DECODER.raw_decode(content, start)
+                return quiz_data
             except json.JSONDecodeError:
-                # Attempt to extract JSON if the response contains additional text
-                import re
-                json_match = re.search(r'(\{.*\})', quiz_content, re.DOTALL)
-                if json_match:
-                    quiz_data = json.loads(json_match.group(1))
-                else:
-                    raise ValueError("Failed to parse quiz data as JSON")
-            
-            # Add metadata
-            quiz_data["cached"] = False
-            quiz_data["generated_at"] = str(datetime.now())
-            
-            # Cache the result if Redis is available
-            if self.redis_client:
-                cache_key = f"quiz:{topic}:{question_count}:{difficulty}"
-                self.redis_client.set(cache_key, json.dumps(quiz_data))
-                # Set expiration (24 hours)
-                self.redis_client.expire(cache_key, 86400)
-                self.logger.info(f"Cached quiz for topic: {topic}")
-            
-            return quiz_data
-            
-        except Exception as e:
-            self.logger.error(f"Error generating quiz: {e}")
-            raise
+                start = content.find("{", start + 1)
+        
+        raise ValueError("Failed to parse quiz data as JSON")
+    
+    def _component_status(self, name: str) -> Optional[bool]:
+        """Report a lazy component as loaded (True), failed (False) or not yet built (None)"""
+        if name not in self.__dict__:
+            return None
+        return bool(self.__dict__[name])
     
     def get_health_status(self) -> Dict[str, Any]:
         """Get health status of all components"""
+        # Inspect lazily loaded components without forcing them to load
         status = {
-            "embeddings": bool(self.embeddings),
-            "llm": bool(self.llm),
+            "embeddings": self._component_status("embeddings"),
+            "llm": self._component_status("llm"),
             "text_splitter": bool(self.text_splitter),
-            "vector_store": bool(self.vector_store),
+            "vector_store": self._component_status("vector_store"),
             # "bm25_retriever": bool(self.bm25_retriever),
             # "reranker": bool(self.reranker),
             "redis": bool(self.redis_client)
         }
         
-        if self.vector_store:
+        vector_store = self.__dict__.get("vector_store")
+        if vector_store:
             try:
-                test_results = self.vector_store.similarity_search("test", k=1)
+                test_results = vector_store.similarity_search("test", k=1)
                 status["weaviate_connection"] = True
             except Exception as e:
                 status["weaviate_connection"] = False
@@ -1,9 +1,11 @@
 from langchain.tools import Tool
 from pydantic import BaseModel, Field
 from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+import functools
 import json
 
-from .quiz_dataset_service import quiz_dataset_service
+from .quiz_dataset_service import get_quiz_dataset_service
 from .educational_api_service import educational_api_service
 
 # Pydantic models for tool inputs
@@ -23,65 +25,77 @@ class EducationalContentInput(BaseModel):
     """Input for educational content search"""
     topic: str = Field(description="Topic to search for educational content")
 
+# Shared pool for tools that fan out independent lookups
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="quiz-tools")
+
+def _dataset_cached(error_message: str):
+    """LRU-cache a quiz dataset tool's output until the dataset is reloaded
+    
+    The decorated function raises on failure. Only successful results are
+    cached; errors are returned as "<error_message>: <exception>" and
+    retried on the next call.
+    """
+    def decorator(func):
+        # The dataset version is part of the key, so entries from before a
+        # reload are never served and simply age out of the LRU
+        cached = functools.lru_cache(maxsize=256)(lambda data_version, *args: func(*args))
+        
+        @functools.wraps(func)
+        def wrapper(*args):
+            try:
+                return cached(get_quiz_dataset_service().data_version, *args)
+            except Exception as e:
+                return f"{error_message}: {str(e)}"
+        
+        wrapper.cache_clear = cached.cache_clear
+        return wrapper
+    return decorator
+
 # Tool functions
+@_dataset_cached("Error searching quiz questions")
 def search_quiz_by_topic(query: str) -> str:
     """Search for quiz questions by topic/category"""
-    try:
-        results = quiz_dataset_service.search_by_topic(query)
-        if not results:
-            return f"No quiz questions found for topic: {query}"
-        
-        formatted_results = []
-        for i, result in enumerate(results[:5], 1):
-            formatted_results.append(f"{i}. {result['question']}")
-        
-        return f"Found {len(results)} quiz questions for topic '{query}':\n" + "\n".join(formatted_results)
-    except Exception as e:
-        return f"Error searching quiz questions: {str(e)}"
+    results = get_quiz_dataset_service().search_by_topic(query)
+    if not results:
+        return f"No quiz questions found for topic: {query}"
+    
+    return f"Found {len(results)} quiz questions for topic '{query}':\n" + "\n".join(
+        f"{i}. {result.question}" for i, result in enumerate(results[:5], 1)
+    )
 
+@_dataset_cached("Error searching quiz questions")
 def search_quiz_by_difficulty(release: str) -> str:
     """Search for quiz questions by difficulty level (3GPP release)"""
-    try:
-        results = quiz_dataset_service.search_by_difficulty(release)
-        if not results:
-            return f"No quiz questions found for 3GPP Release {release}"
-        
-        formatted_results = []
-        for i, result in enumerate(results[:5], 1):
-            formatted_results.append(f"{i}. {result['question']}")
-        
-        return f"Found {len(results)} quiz questions for 3GPP Release {release}:\n" + "\n".join(formatted_results)
-    except Exception as e:
-        return f"Error searching quiz questions: {str(e)}"
+    results = get_quiz_dataset_service().search_by_difficulty(release)
+    if not results:
+        return f"No quiz questions found for 3GPP Release {release}"
+    
+    return f"Found {len(results)} quiz questions for 3GPP Release {release}:\n" + "\n".join(
+        f"{i}. {result.question}" for i, result in enumerate(results[:5], 1)
+    )
 
+@_dataset_cached("Error searching quiz questions")
 def search_quiz_by_keyword(keyword: str) -> str:
     """Search for quiz questions by keyword"""
-    try:
-        results = quiz_dataset_service.search_by_keyword(keyword)
-        if not results:
-            return f"No quiz questions found containing keyword: {keyword}"
-        
-        formatted_results = []
-        for i, result in enumerate(results[:5], 1):
-            formatted_results.append(f"{i}. {result['question']}")
-        
-        return f"Found {len(results)} quiz questions containing '{keyword}':\n" + "\n".join(formatted_results)
-    except Exception as e:
-        return f"Error searching quiz questions: {str(e)}"
+    results = get_quiz_dataset_service().search_by_keyword(keyword)
+    if not results:
+        return f"No quiz questions found containing keyword: {keyword}"
+    
+    return f"Found {len(results)} quiz questions containing '{keyword}':\n" + "\n".join(
+        f"{i}. {result.question}" for i, result in enumerate(results[:5], 1)
+    )
 
 def get_random_quiz_questions(count: str = "5") -> str:
     """Get random quiz questions"""
     try:
         count_int = int(count)
-        results = quiz_dataset_service.get_random_questions(count_int)
+        results = get_quiz_dataset_service().get_random_questions(count_int)
         if not results:
             return "No quiz questions available"
         
-        formatted_results = []
-        for i, result in enumerate(results, 1):
-            formatted_results.append(f"{i}. {result['question']}")
-        
-        return f"Random {len(results)} quiz questions:\n" + "\n".join(formatted_results)
+        return f"Random {len(results)} quiz questions:\n" + "\n".join(
+            f"{i}. {result.question}" for i, result in enumerate(results, 1)
+        )
     except Exception as e:
         return f"Error getting random quiz questions: {str(e)}"
 
@@ -100,7 +114,7 @@ def filter_quiz_questions(input_str: str) -> str:
         keyword = params.get("keyword")
         limit = params.get("limit", 5)
         
-        results = quiz_dataset_service.filter_questions(
+        results = get_quiz_dataset_service().filter_questions(
             category=category,
             release=release,
             keyword=keyword,
@@ -110,38 +124,84 @@ def filter_quiz_questions(input_str: str) -> str:
         if not results:
             return f"No quiz questions found matching the criteria"
         
-        formatted_results = []
-        for i, result in enumerate(results, 1):
-            formatted_results.append(f"{i}. {result['question']}")
+        filter_text = ", ".join(
+            f"{name}: {value}"
+            for name, value in (("category", category), ("release", release), ("keyword", keyword))
+            if value
+        ) or "no filters"
         
-        filter_desc = []
-        if category:
-            filter_desc.append(f"category: {category}")
-        if release:
-            filter_desc.append(f"release: {release}")
-        if keyword:
-            filter_desc.append(f"keyword: {keyword}")
+        return f"Found {len(results)} quiz questions ({filter_text}):\n" + "\n".join(
+            f"{i}. {result.question}" for i, result in enumerate(results, 1)
+        )
+    except Exception as e:
+        return f"Error filtering quiz questions: {str(e)}"
+
+# Batch search dispatch: tool input "type" -> (service method, result label)
+_BATCH_SEARCH_TYPES = {
+    "topic": (lambda query: get_quiz_dataset_service().search_by_topic(query), "topic '{}'"),
+    "difficulty": (lambda query: get_quiz_dataset_service().search_by_difficulty(query), "3GPP Release {}"),
+    "keyword": (lambda query: get_quiz_dataset_service().search_by_keyword(query), "keyword '{}'"),
+}
+
+def search_quiz_batch(input_str: str) -> str:
+    """Run several topic/difficulty/keyword searches in a single tool call"""
+    try:
+        try:
+            requests = json.loads(input_str)
+        except json.JSONDecodeError:
+            return "Batch search input must be a JSON array of {\"type\", \"query\"} objects"
+        
+        if isinstance(requests, dict):
+            requests = [requests]
+        
+        # Deduplicate identical searches while keeping the caller's order
+        unique_requests = []
+        for request in requests:
+            key = (str(request.get("type", "keyword")).lower(), str(request.get("query", "")))
+            if key not in unique_requests:
+                unique_requests.append(key)
         
-        filter_text = ", ".join(filter_desc) if filter_desc else "no filters"
+        # Match all keyword searches in one pass over the dataset
+        keyword_queries = [query for search_type, query in unique_requests if search_type == "keyword"]
+        keyword_results = get_quiz_dataset_service().search_by_keywords(keyword_queries) if keyword_queries else {}
         
-        return f"Found {len(results)} quiz questions ({filter_text}):\n" + "\n".join(formatted_results)
+        sections = []
+        for search_type, query in unique_requests:
+            if search_type not in _BATCH_SEARCH_TYPES:
+                sections.append(f"Unsupported search type '{search_type}' for query '{query}'")
+                continue
+            
+            search, label = _BATCH_SEARCH_TYPES[search_type]
+            results = keyword_results[query] if search_type == "keyword" else search(query)
+            label = label.format(query)
+            
+            if not results:
+                sections.append(f"No quiz questions found for {label}")
+                continue
+            
+            sections.append(f"Found {len(results)} quiz questions for {label}:\n" + "\n".join(
+                f"{i}. {result.question}" for i, result in enumerate(results[:5], 1)
+            ))
+        
+        if not sections:
+            return "No searches provided"
+        
+        return "\n\n".join(sections)
     except Exception as e:
-        return f"Error filtering quiz questions: {str(e)}"
+        return f"Error running batch quiz search: {str(e)}"
 
+@_dataset_cached("Error getting quiz categories")
 def get_quiz_categories() -> str:
     """Get all available quiz categories"""
-    try:
-        categories = quiz_dataset_service.get_all_categories()
-        releases = quiz_dataset_service.get_all_releases()
-        stats = quiz_dataset_service.get_dataset_stats()
-        
-        return f"""Available quiz categories: {', '.join(categories)}
+    categories = get_quiz_dataset_service().get_all_categories()
+    releases = get_quiz_dataset_service().get_all_releases()
+    stats = get_quiz_dataset_service().get_dataset_stats()
+    
+    return f"""Available quiz categories: {', '.join(categories)}
 Available 3GPP releases: {', '.join(releases)}
 Total questions: {stats['total_questions']}
 Questions with 4 options: {stats['questions_with_4_options']}
 Questions with 5 options: {stats['questions_with_5_options']}"""
-    except Exception as e:
-        return f"Error getting quiz categories: {str(e)}"
 
 def search_educational_content(topic: str) -> str:
     """Search for educational content from Khan Academy and other sources"""
@@ -170,6 +230,18 @@ def search_educational_content(topic: str) -> str:
     except Exception as e:
         return f"Error searching educational content: {str(e)}"
 
+def search_quiz_and_educational_content(topic: str) -> str:
+    """Search quiz questions and educational content for a topic concurrently"""
+    try:
+        # The educational lookup is an HTTP call, so run it alongside the
+        # in-memory quiz search instead of after it
+        quiz_future = _executor.submit(search_quiz_by_topic, topic)
+        educational_future = _executor.submit(search_educational_content, topic)
+        
+        return f"{quiz_future.result()}\n\n{educational_future.result()}"
+    except Exception as e:
+        return f"Error searching quiz and educational content: {str(e)}"
+
 def get_khan_academy_topics() -> str:
     """Get available topics from Khan Academy"""
     try:
@@ -231,6 +303,11 @@ def create_quiz_tools() -> List[Tool]:
             description="Filter quiz questions by multiple criteria. Provide JSON string with 'category', 'release', 'keyword', and 'limit' parameters.",
             func=filter_quiz_questions
         ),
+        Tool(
+            name="batch_quiz_search",
+            description="Run several quiz searches in one call. Provide a JSON array of objects with 'type' ('topic', 'difficulty' or 'keyword') and 'query', e.g. [{\"type\": \"keyword\", \"query\": \"MFAF\"}, {\"type\": \"difficulty\", \"query\": \"18\"}].",
+            func=search_quiz_batch
+        ),
         Tool(
             name="get_quiz_categories",
             description="Get all available quiz categories, releases, and dataset statistics.",
@@ -249,6 +326,11 @@ def create_educational_api_tools() -> List[Tool]:
             description="Search for educational content from Khan Academy and other educational sources by topic.",
             func=search_educational_content
         ),
+        Tool(
+            name="search_quiz_and_educational_content",
+            description="Search quiz questions by topic and educational content for the same topic in one call. Use this instead of calling search_quiz_by_topic and search_educational_content separately.",
+            func=search_quiz_and_educational_content
+        ),
         Tool(
             name="get_khan_academy_topics",
             description="Get available topics from Khan Academy API.",
@@ -1,21 +1,114 @@
 import json
 import os
-import random
-from typing import List, Dict, Optional, Any
+import re
+import pickle
+import sys
+import threading
+from bisect import bisect_left
+from dataclasses import dataclass, fields
+from functools import lru_cache
+from typing import List, Dict, Optional, Any, Set, Tuple, Iterable
 from pathlib import Path
 
+import numpy as np
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# ijson reports malformed input with its own exception type
+_JSON_ERRORS = (json.JSONDecodeError, ijson.JSONError) if IJSON_AVAILABLE else (json.JSONDecodeError,)
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+_RELEASE_PATTERN = re.compile(r"\[3GPP Release ([^\[\]]+)\]")
+
+# Length of the vocabulary n-grams used to find tokens containing a keyword
+_TOKEN_GRAM_SIZE = 3
+
+# Pickled sidecar of the parsed dataset and its indexes for warm starts.
+# Bump the version whenever the indexes below change shape.
+_SNAPSHOT_SUFFIX = '.pkl'
+_SNAPSHOT_VERSION = 8
+_SNAPSHOT_ATTRS = (
+    'categories', 'releases', '_keyword_index', '_token_grams', '_lower_question',
+    '_lower_explanation', '_question_order', '_by_category',
+    '_category_keys', '_by_release', '_question_ids', '_stats'
+)
+
+@dataclass(slots=True)
+class QuizQuestion:
+    """A single quiz question from the dataset"""
+    question_id: str
+    question: str = ''
+    option_1: str = ''
+    option_2: str = ''
+    option_3: str = ''
+    option_4: str = ''
+    option_5: Optional[str] = None
+    answer: str = ''
+    explanation: str = ''
+    category: str = ''
+    
+    @classmethod
+    def from_dict(cls, question_id: str, data: Dict[str, Any]) -> 'QuizQuestion':
+        """Build a question from its JSON object, ignoring unknown keys"""
+        return cls(question_id, **{name: data[name] for name in _QUESTION_FIELDS if name in data})
+
+_QUESTION_FIELDS = tuple(field.name for field in fields(QuizQuestion) if field.name != 'question_id')
+
+@lru_cache(maxsize=64)
+def _keyword_automaton(keywords: Tuple[str, ...]):
+    """Build (and cache) an Aho-Corasick automaton for a set of lowercase keywords"""
+    automaton = ahocorasick.Automaton()
+    for keyword in keywords:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
+
 class QuizDatasetService:
     """Service for loading and querying educational quiz datasets"""
     
     def __init__(self, data_path: str = "backend/data/quiz_questions.json"):
         self.data_path = data_path
-        self.quiz_data: Dict[str, Any] = {}
+        # Incremented on every load so callers can invalidate derived caches
+        self.data_version = 0
+        self._rng = np.random.default_rng()
+        self._reset_data()
+        self.load_quiz_data()
+    
+    def _reset_data(self) -> None:
+        """Clear the loaded questions together with every index derived from them"""
+        self.quiz_data: Dict[str, QuizQuestion] = {}
         self.categories: List[str] = []
         self.releases: List[str] = []
-        self.load_quiz_data()
+        self._keyword_index: Dict[str, Set[str]] = {}
+        self._token_grams: Dict[str, Set[str]] = {}
+        self._lower_question: Dict[str, str] = {}
+        self._lower_explanation: Dict[str, str] = {}
+        self._question_order: Dict[str, int] = {}
+        self._by_category: Dict[str, List[str]] = {}
+        self._category_keys: List[str] = []
+        self._by_release: Dict[str, List[str]] = {}
+        self._question_ids = np.array([], dtype=object)
+        self._stats = self._build_stats(0)
     
     def load_quiz_data(self) -> None:
         """Load educational quiz JSONs from the data directory"""
+        self.data_version += 1
         try:
             # Resolve the path relative to the project root
             if os.path.exists(self.data_path):
@@ -24,100 +117,269 @@ class QuizDatasetService:
                 # Try relative to current working directory
                 file_path = os.path.join(os.getcwd(), self.data_path)
             
-            with open(file_path, 'r', encoding='utf-8') as f:
-                self.quiz_data = json.load(f)
+            # Warm start: reuse the parsed data and indexes if the source is unchanged
+            if self._load_snapshot(file_path):
+                print(f"Loaded {len(self.quiz_data)} quiz questions from {file_path} (snapshot)")
+                return
             
-            # Extract categories and releases for filtering
-            self._extract_metadata()
+            with open(file_path, 'rb') as f:
+                if IJSON_AVAILABLE:
+                    # Stream one question at a time and index it as it arrives,
+                    # so the fully parsed document is never held alongside the indexes
+                    self._extract_metadata(ijson.kvitems(f, '', use_float=True))
+                else:
+                    raw_data = f.read()
+                    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so the
+                    # handler below covers both parsers
+                    parsed = orjson.loads(raw_data) if ORJSON_AVAILABLE else json.loads(raw_data)
+                    # Extract categories and releases for filtering
+                    self._extract_metadata(parsed.items())
+            self._write_snapshot(file_path)
             print(f"Loaded {len(self.quiz_data)} quiz questions from {file_path}")
             
         except FileNotFoundError:
             print(f"Quiz data file not found at {self.data_path}")
-            self.quiz_data = {}
-        except json.JSONDecodeError as e:
+            self._reset_data()
+        except _JSON_ERRORS as e:
             print(f"Error parsing JSON file: {e}")
-            self.quiz_data = {}
+            self._reset_data()
     
-    def _extract_metadata(self) -> None:
-        """Extract unique categories and releases from the dataset"""
+    def _load_snapshot(self, file_path: str) -> bool:
+        """Restore data and indexes from the pickle sidecar if it is current"""
+        snapshot_path = file_path + _SNAPSHOT_SUFFIX
+        try:
+            if os.path.getmtime(snapshot_path) < os.path.getmtime(file_path):
+                return False
+            with open(snapshot_path, 'rb') as f:
+                snapshot = pickle.load(f)
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            print(f"Ignoring unreadable quiz data snapshot {snapshot_path}: {e}")
+            return False
+        
+        if snapshot.get('version') != _SNAPSHOT_VERSION:
+            return False
+        
+        self.quiz_data = snapshot['quiz_data']
+        for name in _SNAPSHOT_ATTRS:
+            setattr(self, name, snapshot[name])
+        return True
+    
+    def _write_snapshot(self, file_path: str) -> None:
+        """Persist parsed data and indexes next to the source file"""
+        snapshot = {'version': _SNAPSHOT_VERSION, 'quiz_data': self.quiz_data}
+        for name in _SNAPSHOT_ATTRS:
+            snapshot[name] = getattr(self, name)
+        
+        try:
+            # Serialize before opening the file so a failed pickle leaves no truncated sidecar
+            payload = pickle.dumps(snapshot, protocol=5)
+            with open(file_path + _SNAPSHOT_SUFFIX, 'wb') as f:
+                f.write(payload)
+        except (OSError, pickle.PicklingError) as e:
+            # Read-only data directories (or rows whose class cannot be
+            # imported by name) just skip the warm-start cache
+            print(f"Could not write quiz data snapshot: {e}")
+    
+    def _extract_metadata(self, questions: Iterable[Tuple[str, Dict[str, Any]]]) -> None:
+        """Build quiz_data and extract unique categories and releases
+        
+        Takes a stream of (question_id, question JSON object) pairs, so rows
+        are converted and indexed in a single pass. Everything is built in
+        locals and swapped in at the end, so a parse error part-way through
+        never leaves the indexes out of step with quiz_data.
+        """
         categories = set()
         releases = set()
+        keyword_index: Dict[str, Set[str]] = {}
+        by_category: Dict[str, List[str]] = {}
+        by_release: Dict[str, List[str]] = {}
+        questions_with_5_options = 0
+        lower_question: Dict[str, str] = {}
+        lower_explanation: Dict[str, str] = {}
+        question_order: Dict[str, int] = {}
+        quiz_data: Dict[str, QuizQuestion] = {}
         
-        for question_data in self.quiz_data.values():
-            if 'category' in question_data:
-                categories.add(question_data['category'])
+        for question_id, question_data in questions:
+            question = QuizQuestion.from_dict(question_id, question_data)
+            quiz_data[question_id] = question
+            question_order[question_id] = len(question_order)
+            questions_with_5_options += question.option_5 is not None
+            
+            # Lowercase once and index whole tokens for keyword lookups
+            question_lower = question.question.lower()
+            explanation_lower = question.explanation.lower()
+            lower_question[question_id] = question_lower
+            lower_explanation[question_id] = explanation_lower
+            for token in _TOKEN_PATTERN.findall(question_lower + ' ' + explanation_lower):
+                keyword_index.setdefault(token, set()).add(question_id)
             
-            # Extract 3GPP release from question text
-            question_text = question_data.get('question', '')
-            if '[3GPP Release ' in question_text:
-                try:
-                    release = question_text.split('[3GPP Release ')[1].split(']')[0]
-                    releases.add(release)
-                except IndexError:
-                    pass
+            # Rows in the same category share one interned string, and bucket
+            # keys are casefolded for case-insensitive topic lookups
+            question.category = sys.intern(question.category)
+            by_category.setdefault(sys.intern(question.category.casefold()), []).append(question_id)
+            if question.category:
+                categories.add(question.category)
+            
+            # Extract 3GPP releases from question text; the first tag names
+            # the question's release, and every tag gets a bucket entry
+            question_releases = _RELEASE_PATTERN.findall(question.question)
+            if question_releases:
+                releases.add(question_releases[0])
+            for release in question_releases:
+                bucket = by_release.setdefault(release, [])
+                if not bucket or bucket[-1] != question_id:
+                    bucket.append(question_id)
+        
+        # Trigram -> vocabulary tokens containing it, so substring lookups
+        # intersect a few small sets instead of testing every token
+        token_grams: Dict[str, Set[str]] = {}
+        for token in keyword_index:
+            for start in range(len(token) - _TOKEN_GRAM_SIZE + 1):
+                token_grams.setdefault(token[start:start + _TOKEN_GRAM_SIZE], set()).add(token)
         
+        self.quiz_data = quiz_data
+        self._lower_question = lower_question
+        self._lower_explanation = lower_explanation
+        self._question_order = question_order
         self.categories = sorted(list(categories))
         self.releases = sorted(list(releases))
+        self._keyword_index = keyword_index
+        self._token_grams = token_grams
+        self._by_category = by_category
+        self._by_release = by_release
+        # Sorted keys let prefix lookups bisect to the first match
+        self._category_keys = sorted(by_category)
+        # Id column for random sampling
+        self._question_ids = np.array(list(self.quiz_data), dtype=object)
+        self._stats = self._build_stats(questions_with_5_options)
+    
+    def _build_stats(self, questions_with_5_options: int) -> Dict[str, Any]:
+        """Build the dataset statistics returned by get_dataset_stats"""
+        total_questions = len(self.quiz_data)
+        return {
+            'total_questions': total_questions,
+            'categories': self.categories,
+            'releases': self.releases,
+            'questions_with_5_options': questions_with_5_options,
+            'questions_with_4_options': total_questions - questions_with_5_options
+        }
+    
+    def _build_result(self, question_id: str) -> QuizQuestion:
+        """Build a search result for a question
+        
+        Results are the shared question rows, so callers must treat them as
+        read-only.
+        """
+        return self.quiz_data[question_id]
     
-    def search_by_topic(self, category: str) -> List[Dict[str, Any]]:
+    def search_by_topic(self, category: str) -> List[QuizQuestion]:
         """Search quiz questions by topic/category"""
-        results = []
-        for question_id, question_data in self.quiz_data.items():
-            if question_data.get('category', '').lower() == category.lower():
-                result = question_data.copy()
-                result['question_id'] = question_id
-                results.append(result)
-        return results
-    
-    def search_by_difficulty(self, release: str) -> List[Dict[str, Any]]:
+        return [self._build_result(question_id) for question_id in self._by_category.get(category.casefold(), [])]
+    
+    def search_by_topic_prefix(self, prefix: str) -> List[QuizQuestion]:
+        """Search quiz questions whose category starts with the given prefix"""
+        prefix_folded = prefix.casefold()
+        question_ids = []
+        
+        for key in self._category_keys[bisect_left(self._category_keys, prefix_folded):]:
+            if not key.startswith(prefix_folded):
+                break
+            question_ids.extend(self._by_category[key])
+        
+        question_ids.sort(key=self._question_order.__getitem__)
+        return [self._build_result(question_id) for question_id in question_ids]
+    
+    def search_by_difficulty(self, release: str) -> List[QuizQuestion]:
         """Search quiz questions by difficulty (3GPP release number)"""
-        results = []
-        for question_id, question_data in self.quiz_data.items():
-            question_text = question_data.get('question', '')
-            if f'[3GPP Release {release}]' in question_text:
-                result = question_data.copy()
-                result['question_id'] = question_id
-                results.append(result)
-        return results
-    
-    def search_by_keyword(self, keyword: str) -> List[Dict[str, Any]]:
+        return [self._build_result(question_id) for question_id in self._by_release.get(release, [])]
+    
+    def search_by_keyword(self, keyword: str) -> List[QuizQuestion]:
         """Search quiz questions by keyword in question text"""
-        results = []
-        keyword_lower = keyword.lower()
+        return [self._build_result(question_id) for question_id in self._keyword_question_ids(keyword.lower())]
+    
+    def _keyword_question_ids(self, keyword_lower: str) -> List[str]:
+        """Ids of questions containing a lowercase keyword, in dataset order"""
+        tokens = _TOKEN_PATTERN.findall(keyword_lower)
+        if not tokens:
+            question_ids = self.quiz_data.keys()
+        else:
+            # Any question containing the keyword has an indexed token that
+            # contains the keyword's longest alphanumeric run, so candidates
+            # come from the token vocabulary instead of every question's text
+            probe = max(tokens, key=len)
+            candidates: Set[str] = set()
+            for token in self._tokens_containing(probe):
+                candidates |= self._keyword_index[token]
+            question_ids = sorted(candidates, key=self._question_order.__getitem__)
         
-        for question_id, question_data in self.quiz_data.items():
-            question_text = question_data.get('question', '').lower()
-            explanation = question_data.get('explanation', '').lower()
-            
-            if keyword_lower in question_text or keyword_lower in explanation:
-                result = question_data.copy()
-                result['question_id'] = question_id
-                results.append(result)
+        return [question_id for question_id in question_ids if self._matches_keyword(question_id, keyword_lower)]
+    
+    def _tokens_containing(self, probe: str) -> Iterable[str]:
+        """Vocabulary tokens that contain probe as a substring"""
+        if len(probe) < _TOKEN_GRAM_SIZE:
+            # Too short to have a trigram; one- and two-character probes
+            # are rare enough that scanning the vocabulary is fine
+            return [token for token in self._keyword_index if probe in token]
         
-        return results
+        gram_sets = sorted(
+            (self._token_grams.get(probe[start:start + _TOKEN_GRAM_SIZE], set())
+             for start in range(len(probe) - _TOKEN_GRAM_SIZE + 1)),
+            key=len
+        )
+        # Sharing every trigram doesn't guarantee a substring match, so confirm it
+        return [token for token in gram_sets[0].intersection(*gram_sets[1:]) if probe in token]
     
-    def get_random_questions(self, count: int = 5) -> List[Dict[str, Any]]:
+    def search_by_keywords(self, keywords: List[str]) -> Dict[str, List[QuizQuestion]]:
+        """Search several keywords at once, returning the search_by_keyword results for each
+        
+        With pyahocorasick installed, all keywords are matched in a single
+        pass over each question's text instead of one scan per keyword.
+        """
+        keywords_lower = {keyword: keyword.lower() for keyword in keywords}
+        unique_keywords = tuple(sorted(set(keywords_lower.values())))
+        
+        if AHOCORASICK_AVAILABLE and len(unique_keywords) > 1 and all(unique_keywords):
+            automaton = _keyword_automaton(unique_keywords)
+            matches: Dict[str, List[str]] = {keyword: [] for keyword in unique_keywords}
+            for question_id in self.quiz_data:
+                found = set()
+                for text in (self._lower_question[question_id], self._lower_explanation[question_id]):
+                    for _, keyword in automaton.iter(text):
+                        found.add(keyword)
+                for keyword in found:
+                    matches[keyword].append(question_id)
+            results = {
+                keyword: [self._build_result(question_id) for question_id in question_ids]
+                for keyword, question_ids in matches.items()
+            }
+        else:
+            results = {keyword: self.search_by_keyword(keyword) for keyword in unique_keywords}
+        
+        return {keyword: results[keyword_lower] for keyword, keyword_lower in keywords_lower.items()}
+    
+    def _matches_keyword(self, question_id: str, keyword_lower: str) -> bool:
+        """Substring match against the precomputed lowercase question fields"""
+        return (keyword_lower in self._lower_question[question_id]
+                or keyword_lower in self._lower_explanation[question_id])
+    
+    def get_random_questions(self, count: int = 5) -> List[QuizQuestion]:
         """Get random quiz questions"""
         if not self.quiz_data:
             return []
         
-        question_ids = list(self.quiz_data.keys())
-        selected_ids = random.sample(question_ids, min(count, len(question_ids)))
+        # Sample from the cached id column instead of rebuilding a key list
+        selected_ids = self._rng.choice(
+            self._question_ids, size=min(count, len(self._question_ids)), replace=False
+        )
         
-        results = []
-        for question_id in selected_ids:
-            result = self.quiz_data[question_id].copy()
-            result['question_id'] = question_id
-            results.append(result)
-        
-        return results
+        return [self._build_result(question_id) for question_id in selected_ids]
     
-    def get_question_by_id(self, question_id: str) -> Optional[Dict[str, Any]]:
+    def get_question_by_id(self, question_id: str) -> Optional[QuizQuestion]:
         """Get a specific question by ID"""
         if question_id in self.quiz_data:
-            result = self.quiz_data[question_id].copy()
-            result['question_id'] = question_id
-            return result
+            return self._build_result(question_id)
         return None
     
     def get_all_categories(self) -> List[str]:
@@ -129,53 +391,68 @@ class QuizDatasetService:
         return self.releases
     
     def get_dataset_stats(self) -> Dict[str, Any]:
-        """Get statistics about the dataset"""
-        total_questions = len(self.quiz_data)
-        questions_with_5_options = sum(1 for q in self.quiz_data.values() if 'option_5' in q)
-        
-        return {
-            'total_questions': total_questions,
-            'categories': self.categories,
-            'releases': self.releases,
-            'questions_with_5_options': questions_with_5_options,
-            'questions_with_4_options': total_questions - questions_with_5_options
-        }
+        """Get statistics about the dataset (computed once per load)"""
+        return self._stats
     
     def filter_questions(self, category: Optional[str] = None, 
                         release: Optional[str] = None, 
                         keyword: Optional[str] = None,
-                        limit: Optional[int] = None) -> List[Dict[str, Any]]:
+                        limit: Optional[int] = None) -> List[QuizQuestion]:
         """Filter questions by multiple criteria"""
-        results = []
+        if not self.quiz_data:
+            return []
         
-        for question_id, question_data in self.quiz_data.items():
-            # Category filter
-            if category and question_data.get('category', '').lower() != category.lower():
-                continue
-            
-            # Release filter
-            if release:
-                question_text = question_data.get('question', '')
-                if f'[3GPP Release {release}]' not in question_text:
-                    continue
-            
-            # Keyword filter
+        # Start from the smallest precomputed bucket and narrow it down, so
+        # the work scales with the candidates rather than the whole dataset
+        buckets = []
+        if category:
+            buckets.append(self._by_category.get(category.casefold(), []))
+        if release:
+            buckets.append(self._by_release.get(release, []))
+        
+        if buckets:
+            buckets.sort(key=len)
+            question_ids = buckets[0]
+            for bucket in buckets[1:]:
+                members = set(bucket)
+                question_ids = [question_id for question_id in question_ids if question_id in members]
             if keyword:
                 keyword_lower = keyword.lower()
-                question_text = question_data.get('question', '').lower()
-                explanation = question_data.get('explanation', '').lower()
-                if keyword_lower not in question_text and keyword_lower not in explanation:
-                    continue
-            
-            result = question_data.copy()
-            result['question_id'] = question_id
-            results.append(result)
+                question_ids = [
+                    question_id for question_id in question_ids
+                    if self._matches_keyword(question_id, keyword_lower)
+                ]
+        elif keyword:
+            question_ids = self._keyword_question_ids(keyword.lower())
+        else:
+            question_ids = list(self.quiz_data)
         
-        # Apply limit if specified
-        if limit and len(results) > limit:
-            results = random.sample(results, limit)
+        # Apply limit if specified, sampling ids before building results
+        if limit and len(question_ids) > limit:
+            question_ids = [question_ids[i] for i in self._rng.choice(len(question_ids), size=limit, replace=False)]
         
-        return results
+        return [self._build_result(question_id) for question_id in question_ids]
+
+# Global instance, created on first use so importing this module does not
+# block on parsing and indexing the dataset
+_quiz_dataset_service: Optional[QuizDatasetService] = None
+_quiz_dataset_service_lock = threading.Lock()
+
+def get_quiz_dataset_service() -> QuizDatasetService:
+    """Return the shared quiz dataset service, loading it on first call"""
+    global _quiz_dataset_service
+    if _quiz_dataset_service is None:
+        with _quiz_dataset_service_lock:
+            if _quiz_dataset_service is None:
+                _quiz_dataset_service = QuizDatasetService()
+    return _quiz_dataset_service
+
+def __getattr__(name: str) -> Any:
+    # Keeps `from .quiz_dataset_service import quiz_dataset_service` working
+    if name == 'quiz_dataset_service':
+        return get_quiz_dataset_service()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# Global instance
-quiz_dataset_service = QuizDatasetService() 
\ No newline at end of file
+# Warm the service in the background so the first query usually finds it loaded
+threading.Thread(target=get_quiz_dataset_service, name='quiz-dataset-loader', daemon=True).start()
+ 
\ No newline at end of file
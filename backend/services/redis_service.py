@@ -5,23 +5,126 @@ Handles caching for frequently accessed content with graceful degradation
 
 import json
 import hashlib
+import re
+import socket
+import struct
+import threading
 import time
-from typing import Dict, List, Optional, Any, Union
-from datetime import datetime, timedelta
+from collections import OrderedDict
+from itertools import islice
+from typing import Dict, List, Optional, Any, Tuple, Union
+from datetime import timedelta
 from dataclasses import dataclass, asdict
 from pathlib import Path
 
 try:
     import redis
+    from redis.backoff import ExponentialBackoff
     from redis.exceptions import ConnectionError, TimeoutError, RedisError
+    from redis.retry import Retry
     REDIS_AVAILABLE = True
 except ImportError:
     REDIS_AVAILABLE = False
     print("⚠️  Redis not available. Install with: pip install redis")
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+try:
+    import lz4.frame
+    LZ4_AVAILABLE = True
+except ImportError:
+    LZ4_AVAILABLE = False
+
 from services.init_db import DatabaseManager
 
 
+# Identifiers longer than this are hashed into the cache key
+_MAX_KEY_IDENTIFIER_LENGTH = 64
+
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = "?!.,;: "
+
+# Commands queued per pipeline round trip in batch operations
+_PIPELINE_BATCH_SIZE = 500
+
+# Schema-packed chunk payloads start with 0xC1, a byte that neither JSON nor
+# msgpack output can begin with, followed by a layout version
+_PACKED_CHUNK_MAGIC = b"\xc1\x02"
+_PACKED_CHUNK_FIELDS = frozenset({"chunk_id", "document_id", "chunk_index", "text"})
+# document_id, chunk_index, cached_at epoch seconds, then byte lengths of chunk_id and text
+_PACKED_CHUNK_HEADER = struct.Struct("<qqIII")
+
+# LZ4-compressed payloads carry this flag byte; encoded records are always
+# maps, which JSON and msgpack never start with 0x01
+_COMPRESSED_FLAG = b"\x01"
+
+# Metadata stamped onto every cached record by _build_payload
+_CACHE_METADATA_FIELDS = frozenset({"cached_at", "cache_type"})
+
+
+def _normalize_query(query: str) -> str:
+    """Normalize a search query so trivially different phrasings share a cache entry"""
+    return _WHITESPACE_PATTERN.sub(" ", query.strip().casefold()).rstrip(_TRAILING_PUNCTUATION)
+
+
+def _pack_chunk(chunk: Dict[str, Any], cached_at: int) -> Optional[bytes]:
+    """Pack a chunk and its cache timestamp into a fixed binary layout
+    
+    Returns None when the chunk carries extra fields or unexpected types,
+    in which case the caller falls back to the generic serializer.
+    """
+    if chunk.keys() != _PACKED_CHUNK_FIELDS:
+        return None
+    
+    ints = (chunk["document_id"], chunk["chunk_index"], cached_at)
+    strings = (chunk["chunk_id"], chunk["text"])
+    if not all(type(v) is int for v in ints) or not all(type(v) is str for v in strings):
+        return None
+    
+    encoded = [value.encode() for value in strings]
+    try:
+        header = _PACKED_CHUNK_HEADER.pack(*ints, *(len(value) for value in encoded))
+    except struct.error:
+        return None
+    return b"".join((_PACKED_CHUNK_MAGIC, header, *encoded))
+
+
+def _unpack_chunk(payload: bytes) -> Dict[str, Any]:
+    """Rebuild a chunk cache record written by _pack_chunk"""
+    offset = len(_PACKED_CHUNK_MAGIC)
+    document_id, chunk_index, cached_at, id_length, text_length = _PACKED_CHUNK_HEADER.unpack_from(payload, offset)
+    offset += _PACKED_CHUNK_HEADER.size
+    
+    chunk_id = payload[offset:offset + id_length].decode()
+    offset += id_length
+    text = payload[offset:offset + text_length].decode()
+    
+    return {
+        "chunk_id": chunk_id,
+        "document_id": document_id,
+        "chunk_index": chunk_index,
+        "text": text,
+        "cached_at": cached_at,
+        "cache_type": "chunk"
+    }
+
+
 @dataclass
 class CacheConfig:
     """Configuration for Redis caching"""
@@ -34,6 +137,26 @@ class CacheConfig:
 
     health_check_interval: int = 30
     
+    # Connection pool shared by all callers of this service
+    max_connections: int = 32
+    pool_timeout: int = 5  # seconds to wait for a free connection
+    retry_attempts: int = 3
+    
+    # Payload encoding: "json" (orjson when installed) or "msgpack"
+    serializer: str = "json"
+    
+    # Payloads larger than this many bytes are LZ4-compressed when lz4 is
+    # installed (0 disables compression)
+    compress_threshold: int = 1024
+    
+    # Values larger than this are not cached, so a few outsized payloads
+    # can't evict many small hot ones (0 disables the limit)
+    max_value_bytes: int = 256 * 1024
+    
+    # In-process L1 cache for chunk/quiz/objectives reads (0 disables)
+    l1_maxsize: int = 4096
+    l1_ttl: int = 300  # 5 minutes
+    
     # TTL settings (in seconds)
     chunk_ttl: int = 3600  # 1 hour
     quiz_ttl: int = 1800   # 30 minutes
@@ -42,6 +165,47 @@ class CacheConfig:
     default_ttl: int = 1800  # 30 minutes
 
 
+class _LocalCache:
+    """Thread-safe, size-bounded LRU with per-entry expiry"""
+    
+    def __init__(self, maxsize: int, ttl: int):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+    
+    def put(self, key: str, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def pop(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
 class RedisService:
     """Redis caching service with graceful degradation"""
     
@@ -52,14 +216,23 @@ class RedisService:
         self.is_connected = False
         self.last_health_check = 0
         
+        if self.config.serializer == "msgpack" and not MSGPACK_AVAILABLE:
+            print("⚠️  msgpack not available. Falling back to JSON cache payloads")
+            self.config.serializer = "json"
+        
         # Cache statistics
         self.stats = {
             "hits": 0,
             "misses": 0,
             "errors": 0,
-            "operations": 0
+            "operations": 0,
+            "l1_hits": 0,
+            "admit_skips": 0
         }
         
+        # Parsed values of recent reads, checked before going to Redis
+        self._l1 = _LocalCache(self.config.l1_maxsize, self.config.l1_ttl)
+        
         # Initialize Redis connection
         self._init_redis()
     
@@ -70,15 +243,11 @@ class RedisService:
             return
         
         try:
-            self.client = redis.Redis(
-                host=self.config.host,
-                port=self.config.port,
-                db=self.config.db,
-                password=self.config.password,
-                socket_timeout=self.config.socket_timeout,
-                socket_connect_timeout=self.config.socket_connect_timeout,
-                decode_responses=True
+            pool = redis.BlockingConnectionPool(
+                retry=Retry(ExponentialBackoff(), self.config.retry_attempts),
+                **self._pool_kwargs()
             )
+            self.client = redis.Redis(connection_pool=pool)
             
             # Test connection
             self.client.ping()
@@ -92,30 +261,58 @@ class RedisService:
             self.client = None
             self.is_connected = False
     
-    def _check_health(self) -> bool:
-        """Check Redis health with periodic updates"""
-        current_time = time.time()
+    def _pool_kwargs(self) -> Dict[str, Any]:
+        """Connection pool settings for the Redis client"""
+        # Probe idle sockets so dead peers are noticed before a request uses them
+        keepalive_options = {
+            getattr(socket, name): value
+            for name, value in (("TCP_KEEPIDLE", 30), ("TCP_KEEPINTVL", 10), ("TCP_KEEPCNT", 3))
+            if hasattr(socket, name)
+        }
         
-        # Only check health if enough time has passed
-        if current_time - self.last_health_check < self.config.health_check_interval:
-            return self.is_connected
+        return {
+            "host": self.config.host,
+            "port": self.config.port,
+            "db": self.config.db,
+            "password": self.config.password,
+            "socket_timeout": self.config.socket_timeout,
+            "socket_connect_timeout": self.config.socket_connect_timeout,
+            # Payloads are binary (msgpack, packed chunks) and parsed straight from bytes
+            "decode_responses": False,
+            "socket_keepalive": True,
+            "socket_keepalive_options": keepalive_options,
+            "health_check_interval": self.config.health_check_interval,
+            "max_connections": self.config.max_connections,
+            "timeout": self.config.pool_timeout,
+            "retry_on_error": [ConnectionError, TimeoutError]
+        }
+    
+    def _reconnect(self) -> bool:
+        """Ping a disconnected client, at most once per health check interval
         
+        Live connections are checked by the pool itself (health_check_interval),
+        so this only runs after a failure has marked the service disconnected.
+        """
         if not self.client:
             return False
         
+        current_time = time.time()
+        if current_time - self.last_health_check < self.config.health_check_interval:
+            return False
+        
         try:
             self.client.ping()
+            print("✅ Redis connection established")
             self.is_connected = True
-            self.last_health_check = current_time
-            return True
         except Exception as e:
             print(f"⚠️  Redis health check failed: {e}")
-            self.is_connected = False
-            return False
+        
+        self.last_health_check = current_time
+        return self.is_connected
     
     def _safe_operation(self, operation_func, *args, **kwargs):
         """Execute Redis operation with error handling"""
-        if not self._check_health():
+        if not self.is_connected and not self._reconnect():
             return None
         
         try:
@@ -132,13 +329,150 @@ class RedisService:
             self.stats["errors"] += 1
             return None
     
+    def _serialize(self, data: Any) -> bytes:
+        """Encode a cache payload with the configured serializer"""
+        if self.config.serializer == "msgpack":
+            return msgpack.packb(data, use_bin_type=True)
+        if ORJSON_AVAILABLE:
+            # Non-str keys (e.g. answer maps keyed by question index) are
+            # stringified, as json.dumps does
+            return orjson.dumps(
+                data, option=orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+            )
+        return json.dumps(data).encode()
+    
+    def _build_payload(self, cache_type: str, data: Dict[str, Any], cached_at: int = None) -> bytes:
+        """Stamp cache metadata onto a record and encode it
+        
+        cached_at is epoch seconds; use datetime.fromtimestamp() on read if a
+        datetime is needed.
+        """
+        cached_at = cached_at or int(time.time())
+        
+        if cache_type == "chunk":
+            packed = _pack_chunk(data, cached_at)
+            if packed:
+                return self._compress(packed)
+        
+        # With orjson, encode the caller's dict as-is and splice the metadata
+        # in before its closing brace rather than copying it into a new dict
+        if (ORJSON_AVAILABLE and self.config.serializer == "json" and type(data) is dict
+                and data and not _CACHE_METADATA_FIELDS & data.keys()):
+            metadata = b',"cached_at":%d,"cache_type":"%s"}' % (cached_at, cache_type.encode())
+            return self._compress(self._serialize(data)[:-1] + metadata)
+        
+        return self._compress(self._serialize({
+            **data,
+            "cached_at": cached_at,
+            "cache_type": cache_type
+        }))
+    
+    def _compress(self, payload: bytes) -> bytes:
+        """LZ4-compress a large encoded payload, keeping it only if it shrinks"""
+        if not LZ4_AVAILABLE or not self.config.compress_threshold or len(payload) <= self.config.compress_threshold:
+            return payload
+        compressed = _COMPRESSED_FLAG + lz4.frame.compress(payload)
+        return compressed if len(compressed) < len(payload) else payload
+    
+    def _deserialize(self, payload: bytes) -> Any:
+        """Decode a cache payload written by _build_payload"""
+        if payload[:1] == _COMPRESSED_FLAG:
+            payload = lz4.frame.decompress(payload[1:])
+        if payload[:len(_PACKED_CHUNK_MAGIC)] == _PACKED_CHUNK_MAGIC:
+            return _unpack_chunk(payload)
+        if self.config.serializer == "msgpack":
+            return msgpack.unpackb(payload, raw=False, strict_map_key=False)
+        if ORJSON_AVAILABLE:
+            return orjson.loads(payload)
+        return json.loads(payload)
+    
+    def _get_cached_value(self, key: str) -> Any:
+        """Fetch and decode a key, serving repeat reads from the L1 cache"""
+        value = self._l1.get(key)
+        if value is not None:
+            self.stats["l1_hits"] += 1
+            return value
+        
+        result = self._safe_operation(self.client.get, key)
+        if not result:
+            return None
+        
+        value = self._deserialize(result)
+        self._l1.put(key, value)
+        return value
+    
+    def _admit(self, payload: bytes) -> bool:
+        """Size-aware admission check for a cache write"""
+        if self.config.max_value_bytes and len(payload) > self.config.max_value_bytes:
+            self.stats["admit_skips"] += 1
+            return False
+        return True
+    
+    def _set(self, key: str, ttl: int, payload: bytes, document_id: Any = None) -> bool:
+        """Write an encoded payload with a TTL if it passes admission
+        
+        With a document_id the key is also recorded in that document's index
+        set, in the same round trip.
+        """
+        self._l1.pop(key)
+        if not self._admit(payload):
+            return False
+        if document_id is None:
+            return self._safe_operation(self.client.setex, key, ttl, payload) is not None
+        
+        pipe = self.client.pipeline(transaction=False)
+        pipe.setex(key, ttl, payload)
+        self._queue_commands(pipe, self._doc_index_commands({document_id: [key]}, ttl))
+        results = self._safe_operation(pipe.execute)
+        return bool(results and results[0])
+    
+    @staticmethod
+    def _chunk_cache_id(chunk: Dict[str, Any]) -> str:
+        """Cache identifier for a chunk record in batch writes"""
+        return chunk.get("chunk_id") or f"{chunk.get('document_id')}_{chunk.get('chunk_index')}"
+    
     def _generate_key(self, prefix: str, identifier: str) -> str:
         """Generate consistent cache key"""
-        # Hash long identifiers to keep keys manageable
-        if len(identifier) > 100:
-            identifier = hashlib.md5(identifier.encode()).hexdigest()
+        # Hash long identifiers to keep keys manageable (128-bit digests)
+        if len(identifier) > _MAX_KEY_IDENTIFIER_LENGTH:
+            if XXHASH_AVAILABLE:
+                identifier = xxhash.xxh3_128_hexdigest(identifier)
+            else:
+                identifier = hashlib.blake2b(identifier.encode(), digest_size=16).hexdigest()
         return f"quiz_gen:{prefix}:{identifier}"
     
+    def _search_key(self, query: str, search_type: str) -> str:
+        """Cache key for search results, keyed on the normalized query"""
+        # The raw query is still stored in the payload for provenance
+        return self._generate_key("search", f"{_normalize_query(query)}:{search_type}")
+    
+    @staticmethod
+    def _doc_index_key(document_id: Any) -> str:
+        """Key of the set listing a document's cached chunk/objectives keys"""
+        return f"quiz_gen:doc_index:{document_id}"
+    
+    def _doc_index_commands(self, keys_by_document: Dict[Any, List[str]], ttl: Optional[int]) -> List[tuple]:
+        """Commands adding freshly written keys to their documents' index sets
+        
+        An index expires with the longest configured TTL so it outlives its
+        members, or is made persistent when they are written without expiry.
+        """
+        commands = []
+        for document_id, keys in keys_by_document.items():
+            index_key = self._doc_index_key(document_id)
+            commands.append(("SADD", index_key, *keys))
+            if ttl:
+                commands.append(("EXPIRE", index_key, max(ttl, self.config.chunk_ttl, self.config.objectives_ttl)))
+            else:
+                commands.append(("PERSIST", index_key))
+        return commands
+    
+    @staticmethod
+    def _queue_commands(pipe, commands: List[tuple]) -> None:
+        """Queue raw commands onto a pipeline"""
+        for command in commands:
+            pipe.execute_command(*command)
+    
     # Document Chunks Caching
     def cache_chunk(self, chunk_id: str, chunk_data: Dict[str, Any], ttl: int = None) -> bool:
         """Cache a document chunk"""
@@ -149,21 +483,7 @@ class RedisService:
         ttl = ttl or self.config.chunk_ttl
         
         try:
-            # Add metadata
-            cache_data = {
-                **chunk_data,
-                "cached_at": datetime.now().isoformat(),
-                "cache_type": "chunk"
-            }
-            
-            result = self._safe_operation(
-                self.client.setex,
-                key,
-                ttl,
-                json.dumps(cache_data)
-            )
-            
-            return result is not None
+            return self._set(key, ttl, self._build_payload("chunk", chunk_data), chunk_data.get("document_id"))
             
         except Exception as e:
             print(f"⚠️  Failed to cache chunk {chunk_id}: {e}")
@@ -178,11 +498,11 @@ class RedisService:
         key = self._generate_key("chunk", chunk_id)
         
         try:
-            result = self._safe_operation(self.client.get, key)
+            data = self._get_cached_value(key)
             
-            if result:
+            if data:
                 self.stats["hits"] += 1
-                return json.loads(result)
+                return data
             else:
                 self.stats["misses"] += 1
                 return None
@@ -201,22 +521,31 @@ class RedisService:
         cached_count = 0
         
         try:
-            pipe = self.client.pipeline()
+            # One timestamp for the whole batch
+            cached_at = int(time.time())
+            remaining = iter(chunks)
             
-            for chunk in chunks:
-                chunk_id = chunk.get("chunk_id") or f"{chunk.get('document_id')}_{chunk.get('chunk_index')}"
-                key = self._generate_key("chunk", chunk_id)
+            # Send in bounded windows so a large batch never builds one huge
+            # pipeline buffer or stalls on a single execute()
+            while window := list(islice(remaining, _PIPELINE_BATCH_SIZE)):
+                pipe = self.client.pipeline(transaction=False)
+                keys_by_document: Dict[Any, List[str]] = {}
+                queued = 0
                 
-                cache_data = {
-                    **chunk,
-                    "cached_at": datetime.now().isoformat(),
-                    "cache_type": "chunk"
-                }
+                for chunk in window:
+                    key = self._generate_key("chunk", self._chunk_cache_id(chunk))
+                    self._l1.pop(key)
+                    
+                    payload = self._build_payload("chunk", chunk, cached_at)
+                    if self._admit(payload):
+                        pipe.setex(key, ttl, payload)
+                        queued += 1
+                        if chunk.get("document_id") is not None:
+                            keys_by_document.setdefault(chunk["document_id"], []).append(key)
                 
-                pipe.setex(key, ttl, json.dumps(cache_data))
-            
-            results = pipe.execute()
-            cached_count = sum(1 for r in results if r)
+                # Index updates follow the SETEXs; only the SETEX replies count
+                self._queue_commands(pipe, self._doc_index_commands(keys_by_document, ttl))
+                cached_count += sum(1 for r in pipe.execute()[:queued] if r)
             
             print(f"✅ Cached {cached_count}/{len(chunks)} chunks")
             return cached_count
@@ -225,6 +554,148 @@ class RedisService:
             print(f"⚠️  Batch chunk caching failed: {e}")
             return 0
     
+    def _fire_and_forget_commands(self, chunks: List[Dict[str, Any]], ttl: int) -> Tuple[List[tuple], int]:
+        """SETEX and index commands for a batch, bracketed by CLIENT REPLY OFF/ON
+        
+        Returns the commands and the number of SETEXs among them.
+        """
+        cached_at = int(time.time())
+        commands = [("CLIENT", "REPLY", "OFF")]
+        keys_by_document: Dict[Any, List[str]] = {}
+        for chunk in chunks:
+            key = self._generate_key("chunk", self._chunk_cache_id(chunk))
+            self._l1.pop(key)
+            
+            payload = self._build_payload("chunk", chunk, cached_at)
+            if self._admit(payload):
+                commands.append(("SETEX", key, ttl, payload))
+                if chunk.get("document_id") is not None:
+                    keys_by_document.setdefault(chunk["document_id"], []).append(key)
+        
+        submitted = len(commands) - 1
+        commands.extend(self._doc_index_commands(keys_by_document, ttl))
+        commands.append(("CLIENT", "REPLY", "ON"))
+        return commands, submitted
+    
+    def cache_chunks_batch_fire_and_forget(self, chunks: List[Dict[str, Any]], ttl: int = None) -> int:
+        """Cache multiple chunks without waiting for per-command replies
+        
+        The server is told not to answer the SETEXs, so the only reply read
+        back is the OK for CLIENT REPLY ON. Individual write failures go
+        unnoticed, which is fine for a best-effort cache; use
+        cache_chunks_batch when per-chunk status matters.
+        
+        Returns the number of writes submitted.
+        """
+        if not self.is_connected or not chunks:
+            return 0
+        
+        commands, submitted = self._fire_and_forget_commands(chunks, ttl or self.config.chunk_ttl)
+        if not submitted:
+            return 0
+        
+        pool = self.client.connection_pool
+        try:
+            connection = pool.get_connection()
+        except Exception as e:
+            print(f"⚠️  Fire-and-forget chunk caching failed: {e}")
+            self.stats["errors"] += 1
+            return 0
+        
+        try:
+            connection.send_packed_command(connection.pack_commands(commands))
+            connection.read_response()
+        except Exception as e:
+            # Never hand back a connection that may still have replies off
+            connection.disconnect()
+            print(f"⚠️  Fire-and-forget chunk caching failed: {e}")
+            self.stats["errors"] += 1
+            return 0
+        finally:
+            pool.release(connection)
+        
+        self.stats["operations"] += 1
+        print(f"✅ Submitted {submitted}/{len(chunks)} chunks")
+        return submitted
+    
+    def get_cached_chunks_batch(self, chunk_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Retrieve several cached chunks with a single MGET
+        
+        Returns a dict of the chunk ids that were found; missing ids are omitted.
+        """
+        unique_ids = list(dict.fromkeys(chunk_ids))
+        if not self.is_connected:
+            self.stats["misses"] += len(unique_ids)
+            return {}
+        
+        found: Dict[str, Dict[str, Any]] = {}
+        pending: Dict[str, str] = {}
+        for chunk_id in unique_ids:
+            key = self._generate_key("chunk", chunk_id)
+            value = self._l1.get(key)
+            if value is not None:
+                found[chunk_id] = value
+                self.stats["l1_hits"] += 1
+            else:
+                pending[chunk_id] = key
+        
+        if pending:
+            try:
+                values = self._safe_operation(self.client.mget, list(pending.values())) or []
+                for (chunk_id, key), result in zip(pending.items(), values):
+                    if result:
+                        found[chunk_id] = self._deserialize(result)
+                        self._l1.put(key, found[chunk_id])
+            except Exception as e:
+                print(f"⚠️  Batch chunk retrieval failed: {e}")
+        
+        self.stats["hits"] += len(found)
+        self.stats["misses"] += len(unique_ids) - len(found)
+        return found
+    
+    def cache_chunks_mset(self, chunks: List[Dict[str, Any]], ttl: int = None) -> int:
+        """Cache multiple chunks with a single MSET
+        
+        Entries are written without expiry unless ttl is given, in which case
+        EXPIREs are pipelined behind the MSET in the same round trip.
+        """
+        if not self.is_connected or not chunks:
+            return 0
+        
+        try:
+            cached_at = int(time.time())
+            mapping = {}
+            keys_by_document: Dict[Any, List[str]] = {}
+            for chunk in chunks:
+                key = self._generate_key("chunk", self._chunk_cache_id(chunk))
+                self._l1.pop(key)
+                payload = self._build_payload("chunk", chunk, cached_at)
+                if self._admit(payload):
+                    mapping[key] = payload
+                    if chunk.get("document_id") is not None:
+                        keys_by_document.setdefault(chunk["document_id"], []).append(key)
+            
+            if not mapping:
+                return 0
+            
+            pipe = self.client.pipeline(transaction=False)
+            pipe.mset(mapping)
+            if ttl:
+                for key in mapping:
+                    pipe.expire(key, ttl)
+            self._queue_commands(pipe, self._doc_index_commands(keys_by_document, ttl))
+            
+            results = self._safe_operation(pipe.execute)
+            if not results or not results[0]:
+                return 0
+            
+            print(f"✅ Cached {len(mapping)}/{len(chunks)} chunks")
+            return len(mapping)
+            
+        except Exception as e:
+            print(f"⚠️  Batch chunk caching failed: {e}")
+            return 0
+    
     # Quiz Caching
     def cache_quiz(self, quiz_id: str, quiz_data: Dict[str, Any], ttl: int = None) -> bool:
         """Cache a generated quiz"""
@@ -235,20 +706,7 @@ class RedisService:
         ttl = ttl or self.config.quiz_ttl
         
         try:
-            cache_data = {
-                **quiz_data,
-                "cached_at": datetime.now().isoformat(),
-                "cache_type": "quiz"
-            }
-            
-            result = self._safe_operation(
-                self.client.setex,
-                key,
-                ttl,
-                json.dumps(cache_data)
-            )
-            
-            return result is not None
+            return self._set(key, ttl, self._build_payload("quiz", quiz_data))
             
         except Exception as e:
             print(f"⚠️  Failed to cache quiz {quiz_id}: {e}")
@@ -263,11 +721,11 @@ class RedisService:
         key = self._generate_key("quiz", quiz_id)
         
         try:
-            result = self._safe_operation(self.client.get, key)
+            data = self._get_cached_value(key)
             
-            if result:
+            if data:
                 self.stats["hits"] += 1
-                return json.loads(result)
+                return data
             else:
                 self.stats["misses"] += 1
                 return None
@@ -287,22 +745,10 @@ class RedisService:
         ttl = ttl or self.config.objectives_ttl
         
         try:
-            cache_data = {
-                "document_id": document_id,
-                "objectives": objectives,
-                "cached_at": datetime.now().isoformat(),
-                "cache_type": "objectives"
-            }
-            
-            result = self._safe_operation(
-                self.client.setex,
-                key,
-                ttl,
-                json.dumps(cache_data)
+            return self._set(
+                key, ttl, self._build_payload("objectives", {"document_id": document_id, "objectives": objectives}), document_id
             )
             
-            return result is not None
-            
         except Exception as e:
             print(f"⚠️  Failed to cache objectives for document {document_id}: {e}")
             return False
@@ -316,11 +762,10 @@ class RedisService:
         key = self._generate_key("objectives", str(document_id))
         
         try:
-            result = self._safe_operation(self.client.get, key)
+            data = self._get_cached_value(key)
             
-            if result:
+            if data:
                 self.stats["hits"] += 1
-                data = json.loads(result)
                 return data.get("objectives", [])
             else:
                 self.stats["misses"] += 1
@@ -337,28 +782,13 @@ class RedisService:
         if not self.is_connected:
             return False
         
-        # Create cache key from query and search type
-        cache_key = f"{query}:{search_type}"
-        key = self._generate_key("search", cache_key)
+        key = self._search_key(query, search_type)
         ttl = ttl or self.config.search_results_ttl
         
         try:
-            cache_data = {
-                "query": query,
-                "search_type": search_type,
-                "results": results,
-                "cached_at": datetime.now().isoformat(),
-                "cache_type": "search_results"
-            }
-            
-            result = self._safe_operation(
-                self.client.setex,
-                key,
-                ttl,
-                json.dumps(cache_data)
-            )
-            
-            return result is not None
+            return self._set(key, ttl, self._build_payload(
+                "search_results", {"query": query, "search_type": search_type, "results": results}
+            ))
             
         except Exception as e:
             print(f"⚠️  Failed to cache search results: {e}")
@@ -370,15 +800,14 @@ class RedisService:
             self.stats["misses"] += 1
             return None
         
-        cache_key = f"{query}:{search_type}"
-        key = self._generate_key("search", cache_key)
+        key = self._search_key(query, search_type)
         
         try:
             result = self._safe_operation(self.client.get, key)
             
             if result:
                 self.stats["hits"] += 1
-                data = json.loads(result)
+                data = self._deserialize(result)
                 return data.get("results", [])
             else:
                 self.stats["misses"] += 1
@@ -389,40 +818,126 @@ class RedisService:
             self.stats["misses"] += 1
             return None
     
+    # Targeted Invalidation
+    def invalidate_chunks(self, chunk_ids: List[str]) -> int:
+        """Invalidate cached chunks by id"""
+        deleted = self._invalidate_keys([self._generate_key("chunk", chunk_id) for chunk_id in chunk_ids])
+        if deleted:
+            print(f"✅ Invalidated {deleted} cached chunks")
+        return deleted
+    
+    def invalidate_quiz(self, quiz_id: str) -> bool:
+        """Invalidate a cached quiz"""
+        return self._invalidate_keys([self._generate_key("quiz", quiz_id)]) > 0
+    
+    def invalidate_objectives(self, document_id: int) -> bool:
+        """Invalidate cached learning objectives for a document"""
+        return self._invalidate_keys([self._generate_key("objectives", str(document_id))]) > 0
+    
+    def invalidate_by_document(self, document_id: int) -> int:
+        """Invalidate every chunk and objectives entry cached for a document
+        
+        Uses the document's index set, so the cost is proportional to the
+        document's entries rather than the size of the keyspace.
+        """
+        if not self.is_connected:
+            return 0
+        
+        try:
+            keys = self._safe_operation(self._take_doc_index, document_id) or []
+        except Exception as e:
+            print(f"⚠️  Failed to read cache index for document {document_id}: {e}")
+            keys = []
+        
+        objectives_key = self._generate_key("objectives", str(document_id))
+        if objectives_key not in keys:
+            keys.append(objectives_key)
+        
+        deleted = self._invalidate_keys(keys)
+        if deleted:
+            print(f"✅ Invalidated {deleted} cache entries for document {document_id}")
+        return deleted
+    
+    def _take_doc_index(self, document_id: int) -> List[str]:
+        """Read and delete a document's index set in one transaction"""
+        pipe = self.client.pipeline(transaction=True)
+        pipe.smembers(self._doc_index_key(document_id))
+        pipe.unlink(self._doc_index_key(document_id))
+        members, _ = pipe.execute()
+        return [member.decode() for member in members]
+    
+    def _invalidate_keys(self, keys: List[str]) -> int:
+        """Drop known keys from the L1 cache and Redis"""
+        if not self.is_connected or not keys:
+            return 0
+        
+        for key in keys:
+            self._l1.pop(key)
+        
+        try:
+            return self._safe_operation(self._unlink_keys, keys) or 0
+        except Exception as e:
+            print(f"⚠️  Cache invalidation failed: {e}")
+            return 0
+    
+    def _unlink_keys(self, keys: List[str]) -> int:
+        """UNLINK keys in bounded batches sent in a single pipeline"""
+        pipe = self.client.pipeline(transaction=False)
+        for start in range(0, len(keys), _PIPELINE_BATCH_SIZE):
+            pipe.unlink(*keys[start:start + _PIPELINE_BATCH_SIZE])
+        return sum(pipe.execute())
+    
     # Cache Management
     def invalidate_cache(self, pattern: str = None) -> int:
-        """Invalidate cache entries matching pattern"""
+        """Invalidate cache entries matching pattern
+        
+        Scans the whole keyspace; prefer the id-based invalidate_* methods
+        outside of admin use.
+        """
         if not self.is_connected:
             return 0
         
+        # Glob patterns can't be matched against L1 keys cheaply; it only
+        # holds recent reads, so drop it entirely
+        self._l1.clear()
+        
         try:
             if pattern:
-                # Find keys matching pattern
-                keys = self._safe_operation(self.client.keys, f"quiz_gen:{pattern}:*")
-                if keys:
-                    deleted = self._safe_operation(self.client.delete, *keys)
+                # Remove keys matching pattern
+                deleted = self._safe_operation(self._unlink_matching, f"quiz_gen:{pattern}:*")
+                if deleted:
                     print(f"✅ Invalidated {deleted} cache entries matching '{pattern}'")
-                    return deleted or 0
             else:
                 # Clear all quiz generator cache
-                keys = self._safe_operation(self.client.keys, "quiz_gen:*")
-                if keys:
-                    deleted = self._safe_operation(self.client.delete, *keys)
+                deleted = self._safe_operation(self._unlink_matching, "quiz_gen:*")
+                if deleted:
                     print(f"✅ Invalidated {deleted} cache entries")
-                    return deleted or 0
             
-            return 0
+            return deleted or 0
             
         except Exception as e:
             print(f"⚠️  Cache invalidation failed: {e}")
             return 0
     
-    def get_cache_stats(self) -> Dict[str, Any]:
-        """Get cache statistics"""
+    def _unlink_matching(self, match: str) -> int:
+        """Unlink all keys matching a glob pattern
+        
+        Walks the keyspace with incremental SCAN instead of a blocking KEYS,
+        and frees values asynchronously with UNLINK in bounded batches.
+        """
+        deleted = 0
+        keys = self.client.scan_iter(match=match, count=1000)
+        while batch := list(islice(keys, _PIPELINE_BATCH_SIZE)):
+            deleted += self.client.unlink(*batch)
+        return deleted
+    
+    def _local_stats(self) -> Dict[str, Any]:
+        """Cache statistics tracked in this process"""
         stats = {
             **self.stats,
             "is_connected": self.is_connected,
             "last_health_check": self.last_health_check,
+            "l1_size": len(self._l1),
             "hit_rate": 0.0
         }
         
@@ -430,6 +945,12 @@ class RedisService:
         if total_requests > 0:
             stats["hit_rate"] = stats["hits"] / total_requests
         
+        return stats
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        stats = self._local_stats()
+        
         # Add Redis info if connected
         if self.is_connected:
             try:
@@ -447,14 +968,15 @@ class RedisService:
     
     def health_check(self) -> Dict[str, Any]:
         """Comprehensive health check"""
+        connected = self.is_connected or self._reconnect()
         health_status = {
             "redis_available": REDIS_AVAILABLE,
-            "connected": self.is_connected,
+            "connected": connected,
             "last_check": self.last_health_check,
             "stats": self.get_cache_stats()
         }
         
-        if self.is_connected:
+        if connected:
             try:
                 # Test basic operations
                 test_key = "quiz_gen:health_check"
@@ -462,7 +984,7 @@ class RedisService:
                 test_result = self._safe_operation(self.client.get, test_key)
                 self._safe_operation(self.client.delete, test_key)
                 
-                health_status["operations_working"] = test_result == "test"
+                health_status["operations_working"] = test_result == b"test"
                 health_status["status"] = "healthy"
                 
             except Exception as e:
@@ -479,6 +1001,8 @@ class RedisService:
         if self.client:
             try:
                 self.client.close()
+                # The pool is ours, so Redis.close() leaves it open
+                self.client.connection_pool.disconnect()
                 print("✅ Redis connection closed")
             except:
                 pass
@@ -3,19 +3,97 @@
 Implements Phase 13 - Session Management
 """
 
+import sqlite3
+import threading
+import time
 import uuid
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime, timedelta
 import json
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 from app.core.database import DatabaseManager
 
+_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+# Seconds a session validity lookup is reused before querying the database again
+SESSION_VALIDITY_TTL = 5
+_SESSION_VALIDITY_CACHE_SIZE = 8192
+
+# Applied once to each reader connection; journal_mode is a database-wide
+# setting and is left to DatabaseManager.init_database
+_READ_PRAGMAS = (
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+)
+
+# SQLite caps bound parameters per statement (999 on older builds)
+_MAX_SQL_PARAMS = 500
+
 class SessionService:
     """Service for managing quiz sessions"""
     
+    # Fixed SQL text so each reused connection's statement cache skips re-parsing
+    _QUIZ_COLUMNS = """
+        SELECT q.session_id, q.id AS quiz_id, q.quiz_title, q.difficulty_level,
+               q.total_questions, q.created_at,
+               qq.id AS question_id, qq.question_order, qq.question_type, qq.question_text,
+               qq.options, qq.correct_answer, qq.explanation,
+               qq.difficulty_level AS question_difficulty
+        FROM generated_quizzes q
+        LEFT JOIN quiz_questions qq ON qq.quiz_id = q.id
+    """
+    _SESSION_QUIZ_SQL = _QUIZ_COLUMNS + """
+        WHERE q.id = (SELECT id FROM generated_quizzes WHERE session_id = ? LIMIT 1)
+        ORDER BY qq.question_order
+    """
+    _SESSION_QUIZZES_SQL = _QUIZ_COLUMNS + """
+        WHERE q.id IN (
+            SELECT MIN(id) FROM generated_quizzes WHERE session_id IN ({placeholders}) GROUP BY session_id
+        )
+        ORDER BY q.id, qq.question_order
+    """
+    
     def __init__(self, db_manager: DatabaseManager):
         """Initialize the session service"""
         self.db_manager = db_manager
+        # session_id -> (looked up at, (status, expires_at epoch) or None)
+        self._validity_cache: Dict[str, Tuple[float, Optional[Tuple[str, float]]]] = {}
+        # Writes through the database manager evict cached validity lookups
+        db_manager.add_session_listener(self._forget_session)
+        # One reused connection per thread; all of them are tracked so
+        # close() can release them
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+    
+    def _connection(self) -> sqlite3.Connection:
+        """Get this thread's database connection, opening it on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Only ever used by the opening thread; check_same_thread is off
+            # so close() may run from another one
+            conn = sqlite3.connect(self.db_manager.db_path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            for pragma in _READ_PRAGMAS:
+                conn.execute(pragma)
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+    
+    def close(self) -> None:
+        """Close every reader connection; later reads open fresh ones"""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+            self._local = threading.local()
+        for conn in connections:
+            conn.close()
     
     def create_session(self, document_id: Optional[int] = None, 
                       topic: Optional[str] = None,
@@ -49,72 +127,109 @@ class SessionService:
     
     def get_session_quiz(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Get quiz information for a session"""
-        conn = self.db_manager.get_connection()
-        cursor = conn.cursor()
+        # Fetch the session's quiz and its questions in one round trip
+        rows = self._connection().execute(self._SESSION_QUIZ_SQL, (session_id,)).fetchall()
         
-        # Get quiz information
-        cursor.execute("""
-            SELECT q.id, q.quiz_title, q.difficulty_level, q.total_questions, q.created_at
-            FROM generated_quizzes q
-            WHERE q.session_id = ?
-        """, (session_id,))
-        
-        quiz_result = cursor.fetchone()
-        if not quiz_result:
-            conn.close()
+        if not rows:
             return None
         
-        quiz_id = quiz_result[0]
+        return self._build_session_quiz(session_id, rows)
+    
+    def get_session_quizzes(self, session_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get quiz information for several sessions
         
-        # Get all questions for this quiz
-        cursor.execute("""
-            SELECT id, question_order, question_type, question_text, 
-                   options, correct_answer, explanation, difficulty_level
-            FROM quiz_questions
-            WHERE quiz_id = ?
-            ORDER BY question_order
-        """, (quiz_id,))
+        Returns a dict keyed by session ID; sessions without a quiz are omitted.
+        """
+        unique_ids = list(dict.fromkeys(session_ids))
+        conn = self._connection()
         
-        questions = []
-        for row in cursor.fetchall():
-            options = json.loads(row[4]) if row[4] else None
-            questions.append({
-                'id': row[0],
-                'order': row[1],
-                'type': row[2],
-                'question': row[3],
-                'options': options,
-                'correct_answer': row[5],
-                'explanation': row[6],
-                'difficulty': row[7]
-            })
+        rows_by_session: Dict[str, List[sqlite3.Row]] = {}
+        for start in range(0, len(unique_ids), _MAX_SQL_PARAMS):
+            batch = unique_ids[start:start + _MAX_SQL_PARAMS]
+            sql = self._SESSION_QUIZZES_SQL.format(placeholders=",".join("?" * len(batch)))
+            for row in conn.execute(sql, batch):
+                rows_by_session.setdefault(row['session_id'], []).append(row)
         
-        conn.close()
+        return {
+            session_id: self._build_session_quiz(session_id, rows)
+            for session_id, rows in rows_by_session.items()
+        }
+    
+    @staticmethod
+    def _build_session_quiz(session_id: str, rows: List[sqlite3.Row]) -> Dict[str, Any]:
+        """Assemble a session quiz from its joined quiz/question rows"""
+        quiz = rows[0]
+        
+        # A quiz without questions comes back as a single row of NULLs
+        questions = [
+            {
+                'id': row['question_id'],
+                'order': row['question_order'],
+                'type': row['question_type'],
+                'question': row['question_text'],
+                'options': _loads(row['options']) if row['options'] else None,
+                'correct_answer': row['correct_answer'],
+                'explanation': row['explanation'],
+                'difficulty': row['question_difficulty']
+            }
+            for row in rows
+            if row['question_id'] is not None
+        ]
         
         return {
             'session_id': session_id,
-            'quiz_id': quiz_id,
-            'quiz_title': quiz_result[1],
-            'difficulty_level': quiz_result[2],
-            'total_questions': quiz_result[3],
+            'quiz_id': quiz['quiz_id'],
+            'quiz_title': quiz['quiz_title'],
+            'difficulty_level': quiz['difficulty_level'],
+            'total_questions': quiz['total_questions'],
             'questions': questions,
-            'created_at': quiz_result[4],
+            'created_at': quiz['created_at'],
             'status': 'active'
         }
     
+    def _forget_session(self, session_id: Optional[str]) -> None:
+        """Drop a cached validity lookup (all of them when session_id is None)"""
+        if session_id is None:
+            self._validity_cache.clear()
+        else:
+            self._validity_cache.pop(session_id, None)
+    
+    def _session_validity(self, session_id: str) -> Optional[Tuple[str, float]]:
+        """Get (status, expires_at epoch) for a session, reusing recent lookups
+        
+        Only active sessions are cached; missing or inactive ones are looked
+        up again each time so they are never reported stale.
+        """
+        now = time.monotonic()
+        cached = self._validity_cache.get(session_id)
+        if cached and now - cached[0] < SESSION_VALIDITY_TTL:
+            return cached[1]
+        
+        session = self.get_session(session_id)
+        validity = None
+        if session:
+            validity = (session.get('status'), datetime.fromisoformat(session.get('expires_at')).timestamp())
+        
+        if validity and validity[0] == 'active':
+            if len(self._validity_cache) >= _SESSION_VALIDITY_CACHE_SIZE:
+                self._validity_cache.clear()
+            self._validity_cache[session_id] = (now, validity)
+        return validity
+    
     def is_session_valid(self, session_id: str) -> bool:
         """Check if a session is valid and not expired"""
-        session = self.get_session(session_id)
-        if not session:
+        validity = self._session_validity(session_id)
+        if not validity:
             return False
         
+        status, expires_at = validity
+        
         # Check if session is active
-        if session.get('status') != 'active':
+        if status != 'active':
             return False
         
         # Check if session is expired
-        expires_at = datetime.fromisoformat(session.get('expires_at'))
-        if expires_at < datetime.now():
+        if expires_at < time.time():
             return False
         
         return True
\ No newline at end of file
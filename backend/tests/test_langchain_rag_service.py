@@ -0,0 +1,129 @@
+"""Tests for the LangChain RAG service retrieval paths"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+rag = pytest.importorskip("services.langchain_rag_service")
+
+from services.init_db import DatabaseManager
+
+
+class _StubEmbeddings:
+    def __init__(self):
+        self.embedded_documents = []
+    
+    def embed_query(self, text):
+        return [0.0, 1.0]
+    
+    def embed_documents(self, texts):
+        self.embedded_documents.extend(texts)
+        return [[1.0, 0.0] for _ in texts]
+
+
+class _StubLLM:
+    async def ainvoke(self, prompt):
+        return SimpleNamespace(content='{"title": "T", "questions": []}')
+
+
+@pytest.fixture
+def service(tmp_path):
+    svc = rag.LangChainRAGService(DatabaseManager(str(tmp_path / "rag.db")))
+    # Stand-ins for the lazily loaded models
+    svc.__dict__["embeddings"] = _StubEmbeddings()
+    svc.__dict__["reranker"] = None
+    return svc
+
+
+def test_first_hybrid_search_uses_weaviate_hybrid(service, monkeypatch):
+    client = object()
+    
+    def init_vector_store(weaviate_config):
+        service._weaviate_client = client
+        return object()
+    
+    calls = []
+    
+    def hybrid_search(query, query_vector, top_k):
+        calls.append((query, query_vector, top_k))
+        return [{"content": "chunk", "score": 1.0}]
+    
+    monkeypatch.setattr(service, "_init_vector_store", init_vector_store)
+    monkeypatch.setattr(service, "_weaviate_hybrid_search", hybrid_search)
+    
+    results = service.search("what is 5G", method="hybrid", top_k=3)
+    
+    assert calls == [("what is 5G", [0.0, 1.0], 3)]
+    assert results == [{"content": "chunk", "score": 1.0}]
+
+
+def test_agenerate_quiz_gets_a_semaphore_per_event_loop(service, monkeypatch):
+    service.__dict__["llm"] = _StubLLM()
+    monkeypatch.setattr(service, "_build_quiz_prompt", lambda *args: "prompt")
+    
+    semaphores = []
+    for _ in range(2):
+        quiz = asyncio.run(service.agenerate_quiz("5G"))
+        assert quiz["title"] == "T"
+        semaphores.append(service._llm_semaphore)
+    
+    assert semaphores[0] is not semaphores[1]
+
+
+def test_health_status_does_not_load_components(tmp_path):
+    svc = rag.LangChainRAGService(DatabaseManager(str(tmp_path / "rag.db")))
+    status = svc.get_health_status()
+    
+    assert status["llm"] is None
+    assert status["vector_store"] is None
+    assert "llm" not in svc.__dict__
+
+
+def _chunks(document_id, texts):
+    return [
+        rag.Document(page_content=text, metadata={"document_id": document_id, "chunk_index": i})
+        for i, text in enumerate(texts)
+    ]
+
+
+def test_local_index_uses_ingest_vectors_and_grows_in_place(service):
+    first_id = service._insert_document_record("a.txt", ".txt")
+    service._store_document_chunks(first_id, _chunks(first_id, ["alpha"]), chunk_size=1,
+                                   vectors=[[0.0, 1.0]])
+    
+    assert service._numpy_search([0.0, 1.0], top_k=1)[0]["content"] == "alpha"
+    loaded = service._local_vectors
+    
+    second_id = service._insert_document_record("b.txt", ".txt")
+    second = _chunks(second_id, ["beta"])
+    service._store_document_chunks(second_id, second, chunk_size=1, vectors=[[1.0, 0.0]])
+    service._extend_local_index(second, [[1.0, 0.0]])
+    
+    results = service._numpy_search([1.0, 0.0], top_k=2)
+    
+    assert [r["content"] for r in results] == ["beta", "alpha"]
+    assert service._local_vectors.shape == (2, 2)
+    assert service._local_vectors is not loaded
+    # Stored vectors were reused, nothing was embedded at search time
+    assert service.embeddings.embedded_documents == []
+
+
+def test_restoring_a_chunk_keeps_the_fts_index_consistent(service):
+    document_id = service._insert_document_record("a.txt", ".txt")
+    service._store_document_chunks(document_id, _chunks(document_id, ["old text"]), chunk_size=1)
+    service._store_document_chunks(document_id, _chunks(document_id, ["new text"]), chunk_size=1)
+    
+    with service.db_manager.get_connection() as conn:
+        # rank=1 also checks the index against the content table; raises
+        # sqlite3.DatabaseError if they disagree
+        conn.execute(
+            "INSERT INTO document_chunks_fts(document_chunks_fts, rank) VALUES('integrity-check', 1)"
+        )
+        matches = conn.execute(
+            "SELECT rowid FROM document_chunks_fts WHERE document_chunks_fts MATCH 'old'"
+        ).fetchall()
+        count = conn.execute("SELECT COUNT(*) FROM document_chunks").fetchone()[0]
+    
+    assert matches == []
+    assert count == 1
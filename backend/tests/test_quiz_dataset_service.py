@@ -0,0 +1,39 @@
+"""Tests for the quiz dataset service"""
+
+import json
+
+from services.quiz_dataset_service import QuizDatasetService
+
+
+def _question(category: str, **options: str) -> dict:
+    """A question in the shape of data/quiz_questions.json"""
+    return {
+        "question": "What does [3GPP Release 17] add?",
+        "option_1": "Sidelink relays", "option_2": "Network slicing",
+        "option_3": "Carrier aggregation", "option_4": "Beam management",
+        **options,
+        "answer": "option_1: Sidelink relays", "explanation": "Because", "category": category,
+    }
+
+
+def test_failed_reload_clears_every_index(tmp_path):
+    data_file = tmp_path / "quiz.json"
+    data_file.write_text(json.dumps({
+        "question_0": _question("Standards"),
+        "question_1": _question("Standards", option_5="Dual connectivity"),
+    }))
+    service = QuizDatasetService(str(data_file))
+    assert len(service.search_by_topic("Standards")) == 2
+    assert service.quiz_data["question_1"].option_5 == "Dual connectivity"
+    stats = service.get_dataset_stats()
+    assert stats["questions_with_5_options"] == 1
+    assert stats["questions_with_4_options"] == 1
+    
+    data_file.write_text('{"question 1": {')
+    (tmp_path / "quiz.json.pkl").unlink(missing_ok=True)
+    service.load_quiz_data()
+    
+    assert service.quiz_data == {}
+    assert service.search_by_topic("Standards") == []
+    assert service.search_by_keyword("release") == []
+    assert service.get_dataset_stats()["total_questions"] == 0
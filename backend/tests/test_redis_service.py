@@ -0,0 +1,30 @@
+"""Tests for the Redis caching service payload handling"""
+
+import pytest
+
+from services.redis_service import CacheConfig, RedisService
+
+
+@pytest.fixture
+def service():
+    """RedisService backed by an in-memory fakeredis server"""
+    fakeredis = pytest.importorskip("fakeredis")
+    svc = RedisService(CacheConfig(port=1, retry_attempts=0, socket_connect_timeout=1))
+    svc.client = fakeredis.FakeRedis()
+    svc.is_connected = True
+    return svc
+
+
+@pytest.mark.parametrize("serializer", ["json", "msgpack"])
+def test_int_keyed_payload_round_trips(service, serializer):
+    if serializer == "msgpack":
+        pytest.importorskip("msgpack")
+    service.config.serializer = serializer
+    answers = {0: "b", 2: "c"}
+    
+    assert service.cache_quiz("q3", {"title": "T", "answers": answers})
+    service._l1.clear()
+    
+    cached = service.get_cached_quiz("q3")
+    assert cached["title"] == "T"
+    assert {str(k): v for k, v in cached["answers"].items()} == {"0": "b", "2": "c"}
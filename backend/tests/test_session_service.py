@@ -0,0 +1,51 @@
+"""Tests for the session service"""
+
+import sqlite3
+
+import pytest
+
+from app.core.database import DatabaseManager
+from services.session_service import SessionService
+
+
+def test_validity_follows_writes_made_through_the_database_manager(tmp_path):
+    db_manager = DatabaseManager(str(tmp_path / "sessions.db"))
+    service = SessionService(db_manager)
+    session_id = db_manager.create_session(topic="5G")["session_id"]
+    
+    assert service.is_session_valid(session_id)
+    
+    # Bypasses SessionService.update_session entirely
+    db_manager.update_session(session_id, status="completed")
+    assert not service.is_session_valid(session_id)
+
+
+def test_unknown_session_is_not_cached(tmp_path):
+    db_manager = DatabaseManager(str(tmp_path / "sessions.db"))
+    service = SessionService(db_manager)
+    
+    assert not service.is_session_valid("missing")
+    assert "missing" not in service._validity_cache
+
+
+def test_close_releases_reader_connections(tmp_path):
+    db_manager = DatabaseManager(str(tmp_path / "sessions.db"))
+    service = SessionService(db_manager)
+    session_id = db_manager.create_session(topic="5G")["session_id"]
+    
+    assert service.get_session_quiz(session_id) is None
+    conn = service._connection()
+    service.close()
+    
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")
+    # A later read reopens a connection for this thread
+    assert service.get_session_quiz(session_id) is None
+    assert service._connection() is not conn
+
+
+def test_journal_mode_is_set_by_the_database_manager(tmp_path):
+    db_manager = DatabaseManager(str(tmp_path / "sessions.db"))
+    
+    with db_manager.get_connection() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"